@@ -0,0 +1,56 @@
+"""Conversion of simulation records into Django models for persistence."""
+from .models import Buffer, Device, Report, Source
+
+
+def source_to_model(source, run=None):
+    return Source(
+        run=run,
+        name=source.name,
+        generated=source.generated_count,
+        rejected=source.rejected_count,
+        completed=source.stats.count,
+        avg_waiting_time=source.stats.wait.mean,
+        avg_service_time=source.stats.service.mean,
+    )
+
+
+def device_to_model(device, clock=0.0, run=None):
+    utilization = (device.total_busy_time / clock * 100) if clock > 0 else 0.0
+    return Device(
+        run=run,
+        name=device.name,
+        busy_until=device.busy_until,
+        busy_time=device.total_busy_time,
+        processed=device.processed_count,
+        utilization_percent=min(utilization, 100),
+    )
+
+
+def buffer_to_model(buffer, run=None):
+    return Buffer(run=run, size=buffer.size)
+
+
+def report_to_model(report, source_model, run=None):
+    return Report(
+        run=run,
+        source=source_model,
+        number=report.id,
+        priority=report.priority,
+        status=report.status,
+        submitted_time=report.submitted_time,
+        start_time=report.start_time,
+        end_time=report.end_time,
+    )
+
+
+def simulation_to_models(sim, run=None):
+    """Build unsaved models for a finished run.
+
+    Returns ``(sources, devices, buffer, reports)``; reports are taken from the
+    completed reports the simulation retained, so it has to be created with
+    ``retain_reports=True``.
+    """
+    sources = [source_to_model(s, run) for s in sim.sources]
+    devices = [device_to_model(d, sim.clock, run) for d in sim.devices]
+    reports = [report_to_model(r, sources[r.source.index], run) for r in sim.completed_reports]
+    return sources, devices, buffer_to_model(sim.buffer, run), reports
@@ -0,0 +1,118 @@
+"""Command-line arguments shared by the commands that configure a Simulation."""
+from .distributions import ARRIVAL_PROCESSES, SERVICE_DISTRIBUTIONS
+from .sharding import ROUTERS
+from .simulation import ENGINES
+from .stopping import DEFAULT_METRICS, METRICS
+from .timeseries import DECIMATIONS
+
+DEFAULT_DURATION = 30.0
+
+
+class UsageError(Exception):
+    """Invalid combination of command-line options."""
+
+
+def add_simulation_arguments(parser):
+    parser.add_argument('--engine', choices=ENGINES, default='tick')
+    parser.add_argument('--sources', type=int, default=1)
+    parser.add_argument('--lambda', type=float, default=1)
+    parser.add_argument('--duration', type=float, default=None,
+                        help="Model time to simulate (default 30; in sequential mode an optional cap)")
+    parser.add_argument('--delta', type=float, default=0.5)
+    parser.add_argument('--buffer-size', type=int, default=3)
+    parser.add_argument('--operators', type=int, default=2)
+    parser.add_argument('--arrivals', choices=list(ARRIVAL_PROCESSES), default='uniform')
+    parser.add_argument('--service', choices=list(SERVICE_DISTRIBUTIONS), default='uniform')
+
+
+def add_run_arguments(parser):
+    """Options of a single simulation run (``run_simulation`` and ``app.sim``)."""
+    parser.add_argument('--mode', choices=['step', 'auto', 'sequential', 'analytic'], default='step',
+                        help="sequential: drop the warm-up and run until --precision is reached; "
+                             "analytic: print the queueing-model estimates without simulating")
+    add_simulation_arguments(parser)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--every', type=int, default=1, help="Step mode: print one row per this many steps")
+    parser.add_argument('--only-events', action='store_true', help="Step mode: skip steps without events")
+    parser.add_argument('--diff', action='store_true',
+                        help="Step mode: print the buffer and operators only when they change, "
+                             "and skip steps where nothing changed")
+    parser.add_argument('--max-items', type=int, default=0,
+                        help="Step mode: show at most this many buffered reports and operators (default 0: all)")
+    parser.add_argument('--step-output', help="Step mode: write the table to this file instead of stdout")
+    parser.add_argument('--replications', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--ensemble', action='store_true',
+                        help="Run the replications in lockstep as NumPy arrays (tick engine only)")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="Auto mode: split the platform into this many buffers and device rings "
+                             "(--buffer-size and --operators are per shard), one process each")
+    parser.add_argument('--router', choices=list(ROUTERS), default='hash',
+                        help="With --shards: route reports by source, to the least loaded shard, or by priority")
+    parser.add_argument('--epoch', type=float, default=None,
+                        help="With --shards: model time between load exchanges (default 50 ticks)")
+    parser.add_argument('--input',
+                        help="Replay the report arrivals of this .csv or .parquet submission log instead of "
+                             "generating them (--lambda, --arrivals and --sources are then ignored); "
+                             "without --duration the whole log is replayed")
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help="With --input: model time units per unit of log time (seconds for date-time "
+                             "timestamps); below 1 the history is compressed and the load rises")
+    parser.add_argument('--input-columns', nargs=3, default=None, metavar=('TIME', 'RESEARCHER', 'PRIORITY'),
+                        help="With --input: column names (default timestamp researcher priority)")
+    parser.add_argument('--trace', help="Record every event to this binary trace file")
+    parser.add_argument('--series-out', help="Auto mode: write the per-step time series to a .csv or .parquet file")
+    parser.add_argument('--series-every', type=int, default=1, help="Store one row per this many steps")
+    parser.add_argument('--series-decimate', choices=DECIMATIONS, default='stride')
+    parser.add_argument('--series-max-points', type=int, default=None,
+                        help="Merge rows pairwise whenever the series reaches this length")
+    parser.add_argument('--profile', action='store_true', help="Print a per-phase timing breakdown")
+    parser.add_argument('--profile-dump', help="Also write cProfile statistics of the run to this file")
+    parser.add_argument('--precision', type=float, default=0.05,
+                        help="Sequential mode: target relative CI half-width of every --metrics entry")
+    parser.add_argument('--metrics', nargs='+', choices=METRICS, default=list(DEFAULT_METRICS))
+    parser.add_argument('--window', type=float, default=None,
+                        help="Sequential mode: observation window in model time (default 100 ticks)")
+    parser.add_argument('--batches', type=int, default=20, help="Sequential mode: number of batch means")
+    parser.add_argument('--max-wall-time', type=float, default=None,
+                        help="Sequential mode: wall-clock budget in seconds (default 60 without --duration)")
+    parser.add_argument('--persist', action='store_true',
+                        help="Save the run, its statistics and completed reports to the database")
+    parser.add_argument('--checkpoint', help="Write a checkpoint of the run to this file when it stops")
+    parser.add_argument('--checkpoint-at', type=float, default=None,
+                        help="Stop the run at this model time (requires --checkpoint)")
+    parser.add_argument('--resume', help="Continue the run checkpointed in this file; "
+                                         "the simulation options above are ignored")
+    parser.add_argument('--fork', action='append', default=[], metavar='NAME=VALUE',
+                        help="With --resume: change lambda_rate, buffer_size, num_devices or duration")
+
+
+def fork_changes(specs):
+    """``checkpoint.restore`` overrides from ``--fork NAME=VALUE`` options."""
+    from .checkpoint import FORKABLE
+
+    changes = {}
+    for spec in specs:
+        name, sep, value = spec.partition('=')
+        if not sep or name not in FORKABLE:
+            raise UsageError(f"--fork expects NAME=VALUE with NAME one of {', '.join(FORKABLE)}, got {spec!r}")
+        try:
+            changes[name] = int(value) if name in ('buffer_size', 'num_devices') else float(value)
+        except ValueError:
+            raise UsageError(f"Invalid value for {name}: {value!r}") from None
+    return changes
+
+
+def simulation_params(opts):
+    """``Simulation`` keyword arguments from parsed command options."""
+    return dict(
+        num_sources=opts['sources'],
+        lambda_rate=opts['lambda'],
+        duration=DEFAULT_DURATION if opts['duration'] is None else opts['duration'],
+        delta=opts['delta'],
+        buffer_size=opts['buffer_size'],
+        num_devices=opts['operators'],
+        engine=opts['engine'],
+        arrivals=opts['arrivals'],
+        service=opts['service'],
+    )
@@ -0,0 +1,229 @@
+"""Benchmarks of the simulation core.
+
+Simulation cases vary one parameter at a time around a base configuration,
+giving scaling curves for sources, buffer size, devices and arrival rate.
+Micro-benchmarks time the buffer operations in isolation. Rates are the best
+of ``repeat`` runs; peak memory is measured in a separate traced run so that
+tracemalloc does not distort the timings.
+"""
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from numpy.random import default_rng
+
+from .buffer import IndexedBuffer
+from .records import Report, Source
+from .simulation import ENGINE_VERSION, Simulation
+
+BASE_CASE = dict(num_sources=10, lambda_rate=2.0, delta=0.5, buffer_size=100, num_devices=10)
+
+SCALING_AXES = {
+    'quick': {
+        'num_sources': [1, 100, 10_000],
+        'buffer_size': [3, 1_000, 100_000],
+        'num_devices': [1, 100, 1_000],
+        'lambda_rate': [0.5, 2.0, 20.0],
+    },
+    'full': {
+        'num_sources': [1, 10, 100, 1_000, 10_000],
+        'buffer_size': [3, 100, 1_000, 10_000, 100_000],
+        'num_devices': [1, 10, 100, 1_000],
+        'lambda_rate': [0.5, 2.0, 10.0, 50.0],
+    },
+}
+
+BUFFER_SIZES = {'quick': [3, 1_000, 100_000], 'full': [3, 100, 1_000, 10_000, 100_000]}
+
+# Micro-benchmarks repeat their operation on fresh state until at least this
+# many operations were timed, so that tiny buffers give stable rates.
+MIN_OPS = 100_000
+
+# Start-up of a one-tick run through each entry point, from a fresh interpreter.
+STARTUP_COMMANDS = {
+    'startup/import': ['-c', 'import app.simulation'],
+    'startup/app.sim': ['-m', 'app.sim', '--duration', '0.5'],
+    'startup/manage.py': ['manage.py', 'run_simulation', '--duration', '0.5'],
+}
+
+# Faster is better for every *_per_sec metric; these are compared to a baseline.
+RATE_SUFFIX = '_per_sec'
+
+
+def simulation_cases(scale='quick', engines=('tick', 'event')):
+    """``(name, params)`` pairs of the simulation benchmark matrix."""
+    cases = []
+    for engine in engines:
+        for axis, values in SCALING_AXES[scale].items():
+            for value in values:
+                params = {**BASE_CASE, axis: value, 'engine': engine}
+                if axis == 'buffer_size':
+                    # Overload the devices so that large buffers fill up and
+                    # the eviction path is exercised.
+                    params['lambda_rate'] = 50.0
+                elif axis == 'num_devices':
+                    # Keep the offered load per device roughly constant.
+                    params['lambda_rate'] = 0.15 * value
+                cases.append((f"sim/{engine}/{axis}={value}", params))
+    return cases
+
+
+def bench_simulation(params, steps, repeat):
+    best = None
+    for i in range(repeat):
+        sim = Simulation(**params, duration=steps * params['delta'], seed=i)
+        started = time.perf_counter()
+        n = 0
+        while sim.clock < sim.duration:
+            sim.step()
+            n += 1
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[0]:
+            best = (elapsed, n, sim.generated)
+
+    elapsed, n, generated = best
+    return {
+        'seconds': elapsed,
+        'steps': n,
+        'reports': generated,
+        'steps_per_sec': n / elapsed,
+        'reports_per_sec': generated / elapsed,
+    }
+
+
+def peak_memory(fn):
+    """Peak traced Python allocation of ``fn()`` in KiB."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _reports(n, sources, seed=0):
+    rng = default_rng(seed)
+    picks = rng.integers(0, len(sources), n).tolist()
+    priorities = rng.integers(1, 5, n).tolist()
+    return [Report(i, sources[s], p, 0.0) for i, (s, p) in enumerate(zip(picks, priorities))]
+
+
+def bench_buffer(size, repeat):
+    """Rates of enqueue into free slots, enqueue with eviction and batch pulls."""
+    sources = [Source(i, f"S{i + 1}") for i in range(10)]
+    fill = _reports(size, sources, seed=1)
+    overflow = _reports(max(size, 10_000), sources, seed=2)
+    results = {}
+
+    def rate(name, ops, fn, setup):
+        cycles = -(-MIN_OPS // ops)
+        best = None
+        for _ in range(repeat):
+            elapsed = 0.0
+            for _ in range(cycles):
+                state = setup()
+                started = time.perf_counter()
+                fn(state)
+                elapsed += time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[f'{name}{RATE_SUFFIX}'] = ops * cycles / best if best else float('inf')
+
+    def empty():
+        return IndexedBuffer(size)
+
+    def full():
+        buffer = IndexedBuffer(size)
+        for r in fill:
+            buffer.enqueue(r)
+        return buffer
+
+    def enqueue_all(reports):
+        def run(buffer):
+            for r in reports:
+                buffer.enqueue(r)
+        return run
+
+    def pull_all(buffer):
+        while not buffer.is_empty():
+            buffer.pull_tasks(None)
+
+    rate('enqueue', size, enqueue_all(fill), empty)
+    rate('enqueue_evict', len(overflow), enqueue_all(overflow), full)
+    rate('pull_reports', size, pull_all, full)
+    results['peak_memory_kb'] = peak_memory(lambda: pull_all(full()))
+    return results
+
+
+def bench_startup(args, repeat):
+    """Wall time of a fresh interpreter running ``python <args>`` in ``src``."""
+    cwd = Path(__file__).resolve().parent.parent
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {'seconds': best, f'starts{RATE_SUFFIX}': 1 / best}
+
+
+def run_benchmarks(scale='quick', steps=2000, repeat=3, only=None, progress=None):
+    """Run the suite and return a JSON-serializable result document."""
+    results = {}
+    jobs = []
+
+    if only in (None, 'sim'):
+        for name, params in simulation_cases(scale):
+            jobs.append((name, lambda p=params: {
+                **bench_simulation(p, steps, repeat),
+                'peak_memory_kb': peak_memory(lambda: bench_simulation(p, steps, 1)),
+            }))
+
+    if only in (None, 'buffer'):
+        for size in BUFFER_SIZES[scale]:
+            jobs.append((f"buffer/size={size}", lambda s=size: bench_buffer(s, repeat)))
+
+    if only in (None, 'startup'):
+        for name, args in STARTUP_COMMANDS.items():
+            jobs.append((name, lambda a=args: bench_startup(a, repeat)))
+
+    for i, (name, job) in enumerate(jobs):
+        if progress:
+            progress(i, len(jobs), name)
+        results[name] = job()
+
+    return {
+        'meta': {
+            'engine_version': ENGINE_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': scale,
+            'steps': steps,
+            'repeat': repeat,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """Rate metrics that dropped more than ``threshold`` below the baseline.
+
+    Returns ``(case, metric, baseline, current, change)`` tuples, ``change``
+    being the relative difference (negative when slower).
+    """
+    regressions = []
+    for case, metrics in current['results'].items():
+        base = baseline['results'].get(case)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            if not metric.endswith(RATE_SUFFIX) or not base.get(metric):
+                continue
+            change = value / base[metric] - 1
+            if change < -threshold:
+                regressions.append((case, metric, base[metric], value, change))
+    return regressions
@@ -0,0 +1,110 @@
+import heapq
+from collections import deque
+from itertools import islice
+
+
+class IndexedBuffer:
+    """In-memory report buffer with indexed eviction and batch extraction.
+
+    Behaves exactly like the list-based ``models.Buffer``: reports are kept in
+    arrival order (Д1ОЗ2), on overflow the oldest report with the lowest
+    priority is evicted when the newcomer outranks it (Д1ОО2), and a batch pull
+    takes every report of the source at the head of the queue (Д2Б5).
+
+    Reports are indexed by an arrival sequence number: a dict keeps the live
+    reports in FIFO order, a heap of ``(priority, seq)`` finds the eviction
+    victim and per-source deques hold each source's batch. Entries removed
+    through another index are dropped lazily, so enqueue and eviction cost
+    O(log n) and a batch pull costs O(batch size), amortized.
+    """
+
+    def __init__(self, size=10):
+        self.size = size
+        self._entries = {}
+        self._order = deque()
+        self._by_priority = []
+        self._by_source = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def queue(self):
+        return list(self._entries.values())
+
+    def head(self, n):
+        """The first ``n`` reports in FIFO order, without copying the rest."""
+        return list(islice(self._entries.values(), n))
+
+    def is_empty(self):
+        return not self._entries
+
+    def enqueue(self, report):
+        if len(self._entries) < self.size:
+            self._push(report)
+            return True, None
+
+        if self._entries:
+            priority, seq = self._lowest()
+            if priority < report.priority:
+                heapq.heappop(self._by_priority)
+                replaced = self._entries.pop(seq)
+                replaced.status = "rejected"
+                self._push(report)
+                return True, replaced
+
+        report.status = "rejected"
+        return False, None
+
+    def pull_tasks(self, device, batch_by_source=True):
+        if not self._entries:
+            return []
+
+        head = self._head()
+
+        if batch_by_source:
+            seqs = self._by_source.pop(self._source_key(self._entries[head]))
+            batch = [self._entries.pop(seq) for seq in seqs if seq in self._entries]
+        else:
+            batch = [self._entries.pop(head)]
+
+        for r in batch:
+            r.status = "in_progress"
+
+        return batch
+
+    @staticmethod
+    def _source_key(report):
+        return id(report.source)
+
+    def _push(self, report):
+        seq = self._seq
+        self._seq += 1
+
+        self._entries[seq] = report
+        self._order.append(seq)
+        heapq.heappush(self._by_priority, (report.priority, seq))
+        self._by_source.setdefault(self._source_key(report), deque()).append(seq)
+
+        if len(self._by_priority) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def _head(self):
+        while self._order[0] not in self._entries:
+            self._order.popleft()
+        return self._order[0]
+
+    def _lowest(self):
+        while self._by_priority[0][1] not in self._entries:
+            heapq.heappop(self._by_priority)
+        return self._by_priority[0]
+
+    def _compact(self):
+        """Rebuild the indexes from the live entries, dropping stale ones."""
+        self._order = deque(self._entries)
+        self._by_priority = [(r.priority, seq) for seq, r in self._entries.items()]
+        heapq.heapify(self._by_priority)
+        self._by_source = {}
+        for seq, r in self._entries.items():
+            self._by_source.setdefault(self._source_key(r), deque()).append(seq)
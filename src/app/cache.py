@@ -0,0 +1,45 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from .simulation import ENGINE_VERSION
+
+
+class ResultCache:
+    """On-disk cache of run results keyed by configuration, seed and engine.
+
+    Each result is a JSON file named after the SHA-256 of its key, written
+    atomically, so several processes may share one cache directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(config, seed):
+        payload = json.dumps(
+            {'config': config, 'seed': seed, 'engine_version': ENGINE_VERSION},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, config, seed):
+        try:
+            with open(self._path(self.key(config, seed)), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, config, seed, result):
+        path = self._path(self.key(config, seed))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
@@ -0,0 +1,247 @@
+"""Checkpoints of in-flight simulations: save, resume and fork.
+
+A checkpoint holds the complete state of a ``Simulation``: clock, counters,
+the ``_report_accumulator`` fraction, buffered reports in FIFO order, device
+``busy_until`` times and the ring pointer, the statistics accumulators, the
+state of every random stream and the variates already drawn into its
+``Draws`` block. Restoring it with the same parameters continues the run
+bit-exactly; restoring it with changed ``FORKABLE`` parameters starts a branch
+that shares the whole prefix of the run.
+
+File layout: ``HEADER`` (magic, format version, engine version, payload
+length) followed by the zlib-compressed pickle of ``snapshot(sim)``. Loading
+only unpickles the classes listed in ``_ALLOWED_GLOBALS``.
+"""
+import io
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from heapq import heapify
+from pathlib import Path
+
+from .random_streams import STREAMS
+from .records import Report
+from .simulation import ENGINE_VERSION, Simulation
+
+MAGIC = b'SIMCKPT\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHQ')
+
+FORKABLE = ('lambda_rate', 'buffer_size', 'num_devices', 'duration')
+
+DRAWS = ('_source_draws', '_priority_draws', '_service_draws', '_arrival_counts', '_arrival_intervals')
+ARRIVAL_DRAWS = ('_arrival_counts', '_arrival_intervals')
+
+_ALLOWED_GLOBALS = {
+    ('app.statistics', 'ReportStats'),
+    ('app.statistics', 'RunningStats'),
+    ('app.statistics', 'QuantileSketch'),
+    ('app.distributions', 'UniformService'),
+    ('app.distributions', 'ExponentialService'),
+    ('app.distributions', 'UniformArrivals'),
+    ('app.distributions', 'PoissonArrivals'),
+    ('copyreg', '_reconstructor'),
+    ('builtins', 'object'),
+}
+
+
+class CheckpointError(ValueError):
+    """The file is not a checkpoint this version of the simulation can resume."""
+
+
+def snapshot(sim):
+    """Complete state of ``sim`` as a picklable dict of plain values."""
+    seed = sim.random.seed_sequence
+    dispatcher = sim.dispatcher
+    return {
+        'params': {
+            'lambda_rate': sim.lambda_rate,
+            'duration': sim.duration,
+            'delta': sim.delta,
+            'buffer_size': sim.buffer.size,
+            'num_devices': len(sim.devices),
+            'num_sources': len(sim.sources),
+            'engine': sim.engine,
+            'retain_reports': sim.retain_reports,
+            'crn': sim.crn,
+            'sampling': sim.random.sampling,
+        },
+        'arrivals': sim.arrivals,
+        'service': sim.service,
+        'seed': (seed.entropy, tuple(seed.spawn_key), seed.pool_size, seed.n_children_spawned),
+        'random': {name: getattr(sim.random, name).bit_generator.state for name in STREAMS},
+        'draws': {name: list(getattr(sim, name)._values) for name in DRAWS if hasattr(sim, name)},
+        'clock': sim.clock,
+        'generated': sim.generated,
+        'rejected': sim.rejected,
+        'completed': sim.completed,
+        'started': sim.started,
+        'report_accumulator': sim._report_accumulator,
+        'next_arrival': sim._next_arrival,
+        'arrival_origin': sim._arrival_origin,
+        'arrival_base': sim._arrival_base,
+        'stats': sim.stats,
+        'sources': [(s.generated_count, s.rejected_count, s.stats) for s in sim.sources],
+        'devices': [(d.busy_until, d.total_busy_time, d.processed_count) for d in sim.devices],
+        'dispatcher': (dispatcher.position, list(dispatcher._free), list(dispatcher._busy)),
+        'buffer': [(r.id, r.source.index, r.priority, r.submitted_time, r.service_time) for r in sim.buffer.queue],
+        'completed_reports': [
+            (r.id, r.source.index, r.priority, r.submitted_time, r.start_time, r.end_time)
+            for r in sim.completed_reports
+        ],
+    }
+
+
+def restore(state, trace=None, profiler=None, **changes):
+    """Rebuild a ``Simulation`` from ``snapshot()`` output.
+
+    Without ``changes`` the result continues exactly where the snapshot was
+    taken. ``changes`` may override any of ``FORKABLE``:
+
+    * ``lambda_rate`` discards arrival variates drawn for the old rate and
+      schedules the next arrival from the current flow position;
+    * ``buffer_size`` re-enqueues the buffered reports in arrival order, so a
+      smaller buffer evicts or rejects the excess by the Д1ОО2 rule;
+    * ``num_devices`` adds free devices or drops the trailing ones (batches
+      they were serving still count as completed).
+    """
+    unknown = set(changes) - set(FORKABLE)
+    if unknown:
+        raise ValueError(f"Cannot fork {', '.join(sorted(unknown))}; forkable parameters are {FORKABLE}")
+
+    old = state['params']
+    params = {**old, **changes}
+    rate_changed = params['lambda_rate'] != old['lambda_rate']
+
+    arrivals = state['arrivals']
+    if rate_changed:
+        arrivals = type(arrivals)(params['lambda_rate'])
+
+    sim = Simulation(**params, arrivals=arrivals, service=state['service'], seed=0)
+
+    entropy, spawn_key, pool_size, n_children_spawned = state['seed']
+    sim.random.seed_sequence = type(sim.random.seed_sequence)(
+        entropy, spawn_key=spawn_key, pool_size=pool_size, n_children_spawned=n_children_spawned,
+    )
+    for name, bit_state in state['random'].items():
+        getattr(sim.random, name).bit_generator.state = bit_state
+    for name in DRAWS:
+        if hasattr(sim, name):
+            values = state['draws'].get(name, [])
+            getattr(sim, name)._values = [] if rate_changed and name in ARRIVAL_DRAWS else list(values)
+
+    sim.clock = state['clock']
+    sim.generated = state['generated']
+    sim.rejected = state['rejected']
+    sim.completed = state['completed']
+    sim.started = state['started']
+    sim._report_accumulator = state['report_accumulator']
+    sim._next_arrival = state['next_arrival']
+    sim._arrival_origin = state['arrival_origin']
+    sim._arrival_base = state['arrival_base']
+    sim.stats = state['stats']
+
+    for source, (generated, rejected, stats) in zip(sim.sources, state['sources']):
+        source.generated_count = generated
+        source.rejected_count = rejected
+        source.stats = stats
+
+    for device, (busy_until, busy_time, processed) in zip(sim.devices, state['devices']):
+        device.busy_until = busy_until
+        device.total_busy_time = busy_time
+        device.processed_count = processed
+
+    n_devices = len(sim.devices)
+    position, free, busy = state['dispatcher']
+    dispatcher = sim.dispatcher
+    dispatcher.position = position % n_devices
+    dispatcher._free = sorted([i for i in free if i < n_devices] + list(range(old['num_devices'], n_devices)))
+    dispatcher._busy = [(until, i) for until, i in busy if i < n_devices]
+    heapify(dispatcher._busy)
+
+    for report_id, source_index, priority, submitted, *service_time in state['buffer']:
+        report = Report(report_id, sim.sources[source_index], priority, submitted, *service_time)
+        accepted, replaced = sim.buffer.enqueue(report)
+        lost = replaced if accepted else report
+        if lost is not None:
+            lost.source.rejected_count += 1
+            sim.rejected += 1
+
+    for report_id, source_index, priority, submitted, start, end in state['completed_reports']:
+        report = Report(report_id, sim.sources[source_index], priority, submitted)
+        report.status = "done"
+        report.start_time = start
+        report.end_time = end
+        sim.completed_reports.append(report)
+        report.source.completed_reports.append(report)
+
+    if rate_changed and sim.engine == 'event':
+        if arrivals.random:
+            # Exponential gaps are memoryless: draw a fresh one from now.
+            sim._next_arrival = sim.clock
+        elif old['lambda_rate'] > 0:
+            # Continue the evenly spaced flow from the last arrival.
+            sim._arrival_origin += (sim.generated - sim._arrival_base) / old['lambda_rate']
+            sim._arrival_base = sim.generated
+        else:
+            sim._arrival_origin = sim.clock
+            sim._arrival_base = sim.generated
+        sim._schedule_arrival()
+
+    sim.trace = trace
+    if trace is not None:
+        trace.attach(sim)
+    sim.profiler = profiler
+    if profiler is not None:
+        profiler.instrument(sim)
+
+    return sim
+
+
+def save(sim, path):
+    """Write a checkpoint of ``sim`` to ``path`` atomically."""
+    payload = zlib.compress(pickle.dumps(snapshot(sim), protocol=pickle.HIGHEST_PROTOCOL))
+    path = Path(path)
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, ENGINE_VERSION, len(payload)))
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def read(path):
+    """The ``snapshot()`` dict stored in the checkpoint at ``path``."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise CheckpointError(f"{path} is not a simulation checkpoint")
+        magic, version, engine_version, length = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise CheckpointError(f"{path} is not a simulation checkpoint")
+        if version != FORMAT_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint format version {version}")
+        if engine_version != ENGINE_VERSION:
+            raise CheckpointError(
+                f"Checkpoint was written by engine version {engine_version}, "
+                f"this is version {ENGINE_VERSION}; the run cannot be resumed exactly"
+            )
+        payload = f.read(length)
+
+    if len(payload) != length:
+        raise CheckpointError(f"{path} is truncated")
+    return _Unpickler(io.BytesIO(zlib.decompress(payload))).load()
+
+
+def load(path, trace=None, profiler=None, **changes):
+    """Resume (or, with ``changes``, fork) the run checkpointed at ``path``."""
+    return restore(read(path), trace=trace, profiler=profiler, **changes)
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module, name) not in _ALLOWED_GLOBALS:
+            raise CheckpointError(f"Checkpoint refers to disallowed global {module}.{name}")
+        return super().find_class(module, name)
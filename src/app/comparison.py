@@ -0,0 +1,156 @@
+"""Paired comparison of two configurations with variance reduction.
+
+Replication ``i`` runs configuration A and configuration B and records the
+difference of every metric; the mean of the differences and its t confidence
+interval answer "how much does B change this metric". With common random
+numbers both configurations run with the same seed and ``Simulation(crn=True)``,
+so they see the same reports with the same service times and the noise
+largely cancels in the difference. With antithetic variates every
+configuration is run twice per replication, by inverse-transform sampling at
+``u`` and at ``1 - u``, and the two runs are averaged.
+
+``variance_reduction`` in the results is ``(var A + var B) / var(B - A)``:
+how many times more replications independent runs would need for the same
+half-width.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+from numpy.random import SeedSequence
+
+from .simulation import Simulation
+from .statistics import confidence_interval
+from .sweep import parse_axis, point_metrics
+
+METRICS = ('rejection_percent', 'avg_waiting_time', 'avg_sojourn_time', 'utilization_percent')
+
+# Every ``point_metrics`` value a comparison can be asked for.
+COMPARABLE = METRICS + ('p95_waiting_time', 'avg_service_time')
+
+# Largest growth of the replication count between two precision checks.
+MAX_GROWTH = 2.0
+
+
+def parse_variant(specs):
+    """``Simulation`` overrides from ``NAME=VALUE`` specs such as ``operators=4``."""
+    changes = {}
+    for spec in specs:
+        param, values = parse_axis(spec)
+        if len(values) != 1:
+            raise ValueError(f"Expected a single value in {spec!r}")
+        changes[param] = values[0]
+    return changes
+
+
+def _fresh(seed):
+    """A copy of ``seed`` with no children spawned yet.
+
+    ``RandomStreams`` spawns its streams from the sequence it is given, so
+    runs meant to share streams must not share the ``SeedSequence`` object.
+    """
+    return SeedSequence(seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size)
+
+
+def _run(params, seed, crn, antithetic):
+    """Metrics of one configuration and the number of reports simulated."""
+    if not antithetic:
+        metrics = point_metrics(Simulation(**params, seed=_fresh(seed), crn=crn).run())
+        return metrics, metrics['generated']
+
+    pair = [point_metrics(Simulation(**params, seed=_fresh(seed), crn=crn, sampling=sampling).run())
+            for sampling in ('inverse', 'antithetic')]
+    metrics = {name: (pair[0][name] + pair[1][name]) / 2 for name in pair[0]}
+    return metrics, pair[0]['generated'] + pair[1]['generated']
+
+
+def run_pair(params_a, params_b, seed, crn=True, antithetic=False):
+    """One replication of both configurations: ``(metrics A, metrics B, reports)``."""
+    seed_a, seed_b = (seed, seed) if crn else seed.spawn(2)
+    a, reports_a = _run(params_a, seed_a, crn, antithetic)
+    b, reports_b = _run(params_b, seed_b, crn, antithetic)
+    return a, b, reports_a + reports_b
+
+
+def summarize(rows_a, rows_b, metrics=METRICS, level=0.95):
+    """Means of both configurations and the CI of their paired differences."""
+    result = {}
+    for name in metrics:
+        a = np.array([row[name] for row in rows_a])
+        b = np.array([row[name] for row in rows_b])
+        difference, half_width = confidence_interval((b - a).tolist(), level)
+        var_difference = (b - a).var(ddof=1) if len(a) > 1 else 0.0
+        var_independent = a.var(ddof=1) + b.var(ddof=1) if len(a) > 1 else 0.0
+        result[name] = {
+            'a': float(a.mean()),
+            'b': float(b.mean()),
+            'difference': difference,
+            'half_width': half_width,
+            'relative': (
+                half_width / abs(difference) if difference else (0.0 if half_width == 0 else math.inf)
+            ),
+            'variance_reduction': float(
+                var_independent / var_difference if var_difference > 0 else
+                (math.inf if var_independent > 0 else 1.0)
+            ),
+        }
+    return result
+
+
+def compare(params_a, params_b, replications=10, seed=None, crn=True, antithetic=False, precision=None,
+            max_replications=1000, metrics=METRICS, level=0.95, workers=1, progress=None):
+    """Paired comparison of the ``Simulation`` configurations ``params_a`` and ``params_b``.
+
+    Runs ``replications`` paired replications. With ``precision``, more are
+    added until the relative half-width of every difference in ``metrics``
+    is at most ``precision`` or ``max_replications`` is reached; each round
+    aims at the count the current variance predicts, at most ``MAX_GROWTH``
+    times the previous one. ``progress(result)`` is called after each round.
+
+    Replication ``i`` is seeded with the ``i``-th child of ``SeedSequence(seed)``.
+    """
+    root = SeedSequence(seed)
+    rows_a, rows_b = [], []
+    reports = 0
+    target = min(max(replications, 2), max_replications)
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            seeds = root.spawn(target - len(rows_a))
+            if pool is None:
+                pairs = [run_pair(params_a, params_b, s, crn, antithetic) for s in seeds]
+            else:
+                pairs = list(pool.map(run_pair, repeat(params_a), repeat(params_b), seeds, repeat(crn),
+                                      repeat(antithetic)))
+            for a, b, n in pairs:
+                rows_a.append(a)
+                rows_b.append(b)
+                reports += n
+
+            n = len(rows_a)
+            estimates = summarize(rows_a, rows_b, metrics, level)
+            result = {
+                'replications': n,
+                'reports': reports,
+                'crn': crn,
+                'antithetic': antithetic,
+                'precision': precision,
+                'level': level,
+                'metrics': estimates,
+            }
+            if progress:
+                progress(result)
+
+            worst = max((e['relative'] for e in estimates.values()), default=0.0)
+            if precision is None or worst <= precision or n >= max_replications:
+                result['converged'] = precision is None or worst <= precision
+                return result
+
+            # The half-width shrinks as 1/sqrt(n).
+            needed = n * (worst / precision) ** 2 if math.isfinite(worst) else n * MAX_GROWTH
+            target = min(max_replications, max(n + 1, math.ceil(min(needed, n * MAX_GROWTH))))
+    finally:
+        if pool is not None:
+            pool.shutdown()
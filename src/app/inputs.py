@@ -0,0 +1,175 @@
+"""Arrivals replayed from a submission log (trace-driven input).
+
+A log is a CSV or Parquet file with one row per submitted report: when it
+was submitted, by which researcher and with which priority (1-4), in
+chronological order. The file is read through a generator pipeline,
+``read_chunks`` -> ``parse_chunks`` -> ``records``, ``chunk_size`` rows at a
+time (pandas ``chunksize`` for CSV, ``pyarrow`` record batches for Parquet),
+so a run holds one chunk in memory whatever the size of the log.
+
+``FileArrivals`` plugs the stream into ``Simulation(arrivals=...)``. The
+simulation then draws no arrivals, sources or priorities: each row is offered
+to the buffer at its instant, and every researcher becomes a ``Source`` the
+first time they submit.
+
+Timestamps are either numbers, used as they are, or date-times, counted in
+seconds. Model time starts at the first row and is ``time_scale`` model
+units per unit of log time, so a smaller ``time_scale`` packs the same
+history into less model time and raises the load.
+"""
+import numpy as np
+import pandas as pd
+
+# Default column names: submission instant, researcher and priority.
+COLUMNS = ('timestamp', 'researcher', 'priority')
+
+CHUNK_ROWS = 100_000
+
+PRIORITIES = (1, 4)
+
+
+class InputError(ValueError):
+    """The submission log cannot be replayed."""
+
+
+def read_chunks(path, columns=COLUMNS, chunk_size=CHUNK_ROWS):
+    """DataFrames of at most ``chunk_size`` rows of ``columns`` from a .csv or .parquet file."""
+    path = str(path)
+    columns = list(columns)
+
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError(f"Reading Parquet logs needs pyarrow: {exc}") from exc
+
+        log = pq.ParquetFile(path)
+        _check_columns(columns, log.schema_arrow.names)
+        for batch in log.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    _check_columns(columns, pd.read_csv(path, nrows=0).columns)
+    # Researcher ids are read as text so that every chunk maps them alike.
+    dtype = {columns[1]: str} if len(columns) > 1 else None
+    with pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunk_size) as reader:
+        yield from reader
+
+
+def _check_columns(columns, available):
+    missing = [name for name in columns if name not in available]
+    if missing:
+        raise InputError(f"Missing input columns: {', '.join(missing)}")
+
+
+def _seconds(column):
+    """Timestamps as float seconds: numbers as they are, date-times since the epoch.
+
+    Missing and unparsable timestamps become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=float)
+    if not pd.api.types.is_datetime64_any_dtype(column):
+        column = pd.to_datetime(column, utc=True, errors='coerce')
+    if column.dt.tz is not None:
+        column = column.dt.tz_convert('UTC').dt.tz_localize(None)
+    values = column.to_numpy(dtype='datetime64[ns]')
+    seconds = values.astype(np.int64) / 1e9
+    seconds[np.isnat(values)] = np.nan
+    return seconds
+
+
+def _missing_timestamp(row):
+    return InputError(f"Input row {row} is missing its timestamp or is out of chronological order")
+
+
+def parse_chunks(chunks, columns=COLUMNS, time_scale=1.0):
+    """``(times, researchers, priorities)`` per chunk, times in model units from the first row.
+
+    Raises ``InputError`` for missing or unparsable timestamps, rows out of
+    chronological order and priorities that are not integers 1-4, naming the
+    first offending row.
+    """
+    time_column, researcher_column, priority_column = columns
+    origin = None
+    last = -np.inf
+    row = 0
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        seconds = _seconds(chunk[time_column])
+        if origin is None:
+            origin = seconds[0]
+        times = (seconds - origin) * time_scale
+
+        invalid = np.isnan(times) | (np.diff(times, prepend=last) < 0)
+        if invalid.any():
+            raise _missing_timestamp(row + int(invalid.argmax()) + 1)
+
+        raw = chunk[priority_column]
+        priorities = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+        low, high = PRIORITIES
+        # NaN (missing or not a number) fails every comparison and is invalid too.
+        invalid = ~((priorities >= low) & (priorities <= high) & (priorities == np.floor(priorities)))
+        if invalid.any():
+            index = int(invalid.argmax())
+            raise InputError(f"Input row {row + index + 1} has priority {raw.iloc[index]!r}, "
+                             f"expected an integer {low}-{high}")
+
+        # Researcher ids as text whatever the file format stored them as.
+        yield times, chunk[researcher_column].astype(str).tolist(), priorities.astype(np.int64)
+        last = times[-1]
+        row += len(chunk)
+
+
+def records(parsed):
+    """One ``(time, researcher, priority)`` tuple per row of the parsed chunks."""
+    for times, researchers, priorities in parsed:
+        yield from zip(times.tolist(), researchers, priorities.tolist())
+
+
+class FileArrivals:
+    """The arrival flow of a submission log, for ``Simulation(arrivals=...)``.
+
+    Holds only the reading options; every ``stream()`` reads the file anew,
+    so the object can be shared by replications.
+    """
+
+    random = False
+    replay = True
+
+    def __init__(self, path, time_scale=1.0, columns=COLUMNS, chunk_size=CHUNK_ROWS):
+        if time_scale <= 0:
+            raise ValueError("time_scale must be positive")
+        if len(columns) != len(COLUMNS):
+            raise ValueError(f"Expected {len(COLUMNS)} column names (timestamp, researcher, priority)")
+        self.path = str(path)
+        self.time_scale = time_scale
+        self.columns = tuple(columns)
+        self.chunk_size = chunk_size
+
+    def stream(self):
+        """``(time, researcher, priority)`` of every row, in order."""
+        return records(parse_chunks(read_chunks(self.path, self.columns, self.chunk_size),
+                                    self.columns, self.time_scale))
+
+    def end_time(self):
+        """Model time of the last row; only the timestamp column is read."""
+        origin = end = None
+        row = 0
+        for chunk in read_chunks(self.path, self.columns[:1], self.chunk_size):
+            if chunk.empty:
+                continue
+            seconds = _seconds(chunk[self.columns[0]])
+            missing = np.isnan(seconds)
+            if missing.any():
+                raise _missing_timestamp(row + int(missing.argmax()) + 1)
+            if origin is None:
+                origin = seconds[0]
+            end = seconds[-1]
+            row += len(chunk)
+        return 0.0 if origin is None else float((end - origin) * self.time_scale)
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,389 @@
+"""Simulation and sweep jobs executed in a bounded process pool.
+
+``JobManager`` is shared by every request of the process but tied to no
+event loop: under ASGI all requests share the server's loop, while under WSGI
+or ``async_to_sync`` each request may run in a loop of its own that is closed
+afterwards. A submitted job is a future of the process pool, finished in its
+done callback, so hundreds of queued or running jobs cost only their
+bookkeeping. Workers report progress through a ``multiprocessing.Manager``
+queue read by a thread, and every snapshot is handed to each subscriber
+through the loop that subscriber waits in. The state shared by these threads
+is guarded by one lock.
+
+Jobs are keyed by ``ResultCache.key`` of their configuration and seed: an
+identical submission returns the job already queued, running or finished,
+and results are stored in the cache so they survive restarts.
+
+This module does not import Django; the views pass their settings in.
+"""
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from .cache import ResultCache
+from .distributions import ARRIVAL_PROCESSES, SERVICE_DISTRIBUTIONS
+from .simulation import ENGINES, Simulation
+from .sweep import grid_points, parse_axis, run_sweep
+
+KINDS = ('simulation', 'sweep')
+
+# Job states, in the order a job goes through them.
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+# Seconds between progress snapshots sent by a running simulation.
+PROGRESS_INTERVAL = 0.5
+
+# Steps between checks of the progress clock in the worker.
+PROGRESS_CHECK_STEPS = 256
+
+# Finished jobs kept in memory; older ones are still found in the cache.
+MAX_FINISHED_JOBS = 1000
+
+# name -> (type, minimum, maximum) of the accepted ``Simulation`` parameters.
+PARAMETERS = {
+    'num_sources': (int, 1, 10_000),
+    'lambda_rate': (float, 0.0, 10_000.0),
+    'duration': (float, 0.0, 1e7),
+    'delta': (float, 1e-9, 1e7),
+    'buffer_size': (int, 0, 100_000),
+    'num_devices': (int, 1, 10_000),
+}
+
+# The API is open, so one request must not queue unbounded work: ticks
+# (duration / delta) and expected arrivals (lambda_rate * duration) per
+# simulation, grid cells per sweep and simulations per sweep.
+MAX_TICKS = 10_000_000
+MAX_ARRIVALS = 10_000_000
+MAX_GRID_CELLS = 1_000
+MAX_REPLICATIONS = 100
+MAX_SWEEP_RUNS = 10_000
+
+CHOICES = {
+    'engine': ENGINES,
+    'arrivals': tuple(ARRIVAL_PROCESSES),
+    'service': tuple(SERVICE_DISTRIBUTIONS),
+}
+
+DEFAULTS = dict(
+    num_sources=1, lambda_rate=1.0, duration=30.0, delta=0.5, buffer_size=3, num_devices=2,
+    engine='tick', arrivals='uniform', service='uniform',
+)
+
+
+def job_config(data):
+    """Validated job configuration from a submitted JSON object.
+
+    Raises ``ValueError`` with a message suitable for the client.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+
+    kind = data.get('kind', 'simulation')
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+
+    raw = data.get('params', {})
+    if not isinstance(raw, dict):
+        raise ValueError("params must be an object")
+    unknown = set(raw) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    params = dict(DEFAULTS)
+    for name, value in raw.items():
+        if name in CHOICES:
+            if value not in CHOICES[name]:
+                raise ValueError(f"{name} must be one of {', '.join(CHOICES[name])}")
+            params[name] = value
+            continue
+
+        cast, minimum, maximum = PARAMETERS[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be a number")
+        if cast is int and value != int(value):
+            raise ValueError(f"{name} must be an integer")
+        value = cast(value)
+        if not math.isfinite(value) or not minimum <= value <= maximum:
+            raise ValueError(f"{name} must be a finite number between {minimum} and {maximum}")
+        params[name] = value
+    check_size(params)
+
+    seed = data.get('seed', 0)
+    if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+        raise ValueError("seed must be a non-negative integer")
+
+    config = {'kind': kind, 'params': params, 'seed': seed}
+
+    if kind == 'sweep':
+        grid = data.get('grid')
+        if not isinstance(grid, list) or not grid or not all(isinstance(a, str) for a in grid):
+            raise ValueError("grid must be a non-empty list of axes such as \"lambda=0.5,1,2\"")
+        axes = [parse_axis(spec, max_values=MAX_GRID_CELLS) for spec in grid]
+        cells = math.prod(len(values) for _, values in axes)
+        if cells > MAX_GRID_CELLS:
+            raise ValueError(f"The grid has {cells} cells, at most {MAX_GRID_CELLS} are allowed")
+        replications = data.get('replications', 1)
+        if (isinstance(replications, bool) or not isinstance(replications, int)
+                or not 1 <= replications <= MAX_REPLICATIONS):
+            raise ValueError(f"replications must be an integer between 1 and {MAX_REPLICATIONS}")
+        if cells * replications > MAX_SWEEP_RUNS:
+            raise ValueError(f"The sweep needs {cells * replications} simulations, at most {MAX_SWEEP_RUNS} "
+                             f"are allowed")
+        for point in grid_points(params, axes):
+            check_size(point)
+        config['grid'] = grid
+        config['replications'] = replications
+
+    return config
+
+
+def check_size(params):
+    """Raise ``ValueError`` when one simulation of ``params`` exceeds the job limits."""
+    for name, value in params.items():
+        if name in PARAMETERS:
+            cast, minimum, maximum = PARAMETERS[name]
+            if not minimum <= value <= maximum:
+                raise ValueError(f"{name} must be between {minimum} and {maximum}")
+
+    ticks = params['duration'] / params['delta']
+    if ticks > MAX_TICKS:
+        raise ValueError(f"duration / delta is {ticks:.0f} ticks, at most {MAX_TICKS} are allowed")
+    arrivals = params['lambda_rate'] * params['duration']
+    if arrivals > MAX_ARRIVALS:
+        raise ValueError(f"lambda_rate * duration is {arrivals:.0f} arrivals, at most {MAX_ARRIVALS} "
+                         f"are allowed")
+
+
+def run_job(job_id, config, progress, cache_dir=None):
+    """Pool worker: run one job, sending ``(job_id, event, data)`` to ``progress``.
+
+    ``event`` is ``RUNNING`` once a worker has picked the job up, then
+    ``'progress'`` with a snapshot at most every ``PROGRESS_INTERVAL``.
+    """
+    params = config['params']
+    seed = config['seed']
+    last = time.monotonic()
+    progress.put((job_id, RUNNING, None))
+
+    if config['kind'] == 'sweep':
+        points = grid_points(params, [parse_axis(spec) for spec in config['grid']])
+
+        def report(done, total):
+            progress.put((job_id, 'progress', {'done': done, 'total': total}))
+
+        cache = ResultCache(cache_dir) if cache_dir else None
+        return run_sweep(points, seed=seed, replications=config['replications'], cache=cache, progress=report)
+
+    sim = Simulation(**params, seed=seed)
+    steps = 0
+    while sim.clock < sim.duration:
+        sim.step()
+        steps += 1
+        if steps % PROGRESS_CHECK_STEPS == 0 and time.monotonic() - last >= PROGRESS_INTERVAL:
+            last = time.monotonic()
+            progress.put((job_id, 'progress', snapshot(sim)))
+
+    return sim.summary()
+
+
+def snapshot(sim):
+    return {
+        'clock': sim.clock,
+        'duration': sim.duration,
+        'buffer_state': sim.buffer_state(),
+        'devices_state': sim.devices_state(),
+        'rejection_percent': sim.rejection_percent(),
+        'generated': sim.generated,
+        'completed': sim.completed,
+    }
+
+
+class Job:
+    __slots__ = ('id', 'key', 'config', 'status', 'progress', 'result', 'error',
+                 'submitted_at', 'started_at', 'finished_at', 'subscribers')
+
+    def __init__(self, key, config):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.config = config
+        self.status = QUEUED
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # asyncio.Queue -> the event loop it is read from.
+        self.subscribers = {}
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def as_dict(self, with_result=True):
+        data = {
+            'id': self.id,
+            'kind': self.config['kind'],
+            'status': self.status,
+            'config': self.config,
+            'progress': self.progress,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.error is not None:
+            data['error'] = self.error
+        if with_result and self.status == DONE:
+            data['result'] = self.result
+        return data
+
+    def publish(self, event, data):
+        """Wake every subscriber in its own loop; may be called from any thread."""
+        for queue, loop in list(self.subscribers.items()):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+            except RuntimeError:
+                # The subscriber's loop is closed, so nobody reads the queue.
+                del self.subscribers[queue]
+
+
+class JobManager:
+    def __init__(self, workers=None, cache_dir=None):
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        self.cache_dir = cache_dir
+        self.jobs = {}
+        self._by_key = {}
+        self._finished = OrderedDict()
+        self._lock = threading.RLock()
+        # Cache reads and writes do file I/O and hashing, kept off the event loops.
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-cache')
+
+        context = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        self._mp_manager = context.Manager()
+        self._progress = self._mp_manager.Queue()
+        threading.Thread(target=self._forward_progress, name='job-progress', daemon=True).start()
+
+    async def submit(self, config):
+        """Return ``(job, created)``; identical configurations share one job."""
+        key = ResultCache.key(config, config['seed'])
+        job = self._known(key)
+        if job is not None:
+            return job, False
+
+        result = None
+        if self.cache:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._io, self.cache.get, config, config['seed'])
+
+        with self._lock:
+            # The same configuration may have been submitted during the lookup.
+            job = self._known(key)
+            if job is not None:
+                return job, False
+
+            job = Job(key, config)
+            self.jobs[job.id] = job
+            self._by_key[key] = job
+
+            if result is not None:
+                job.status = DONE
+                job.result = result
+                job.started_at = job.finished_at = job.submitted_at
+                self._retire(job)
+                return job, True
+
+            future = self._pool.submit(run_job, job.id, job.config, self._progress, self.cache_dir)
+        future.add_done_callback(partial(self._finish, job))
+        return job, True
+
+    def _known(self, key):
+        with self._lock:
+            job = self._by_key.get(key)
+            return job if job is not None and job.status != FAILED else None
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def all(self):
+        with self._lock:
+            return list(self.jobs.values())
+
+    def subscribe(self, job):
+        """A queue of the job's events, read from the running event loop."""
+        queue = asyncio.Queue()
+        with self._lock:
+            job.subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, job, queue):
+        with self._lock:
+            job.subscribers.pop(queue, None)
+
+    def _finish(self, job, future):
+        """Done callback of the job's pool future, run in a pool thread."""
+        try:
+            result = future.result()
+        except Exception as exc:
+            status, error = FAILED, f"{type(exc).__name__}: {exc}"
+        else:
+            status, error = DONE, None
+            if self.cache:
+                self._io.submit(self.cache.put, job.config, job.config['seed'], result)
+
+        with self._lock:
+            job.result = result if status == DONE else None
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            job.publish('status', {'status': job.status})
+            self._retire(job)
+
+    def _retire(self, job):
+        self._finished[job.id] = job
+        while len(self._finished) > MAX_FINISHED_JOBS:
+            old_id, old = self._finished.popitem(last=False)
+            self.jobs.pop(old_id, None)
+            if self._by_key.get(old.key) is old:
+                del self._by_key[old.key]
+
+    def _forward_progress(self):
+        while True:
+            try:
+                message = self._progress.get()
+            except (EOFError, OSError):
+                return
+            self._on_progress(*message)
+
+    def _on_progress(self, job_id, event, data):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.finished:
+                return
+            if event == RUNNING:
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.publish('status', {'status': RUNNING})
+            else:
+                job.progress = data
+                job.publish('progress', data)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager(workers=None, cache_dir=None):
+    """The process-wide ``JobManager``, shared by every thread and event loop."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(workers, cache_dir)
+    return _manager
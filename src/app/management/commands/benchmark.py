@@ -0,0 +1,74 @@
+import json
+import sys
+
+import pandas as pd
+from django.core.management import BaseCommand, CommandError
+
+from ...benchmarks import compare, run_benchmarks
+
+# Baseline metadata that must match the current run for rates to be comparable.
+HOST_KEYS = ('python', 'platform')
+
+
+class Command(BaseCommand):
+    help = "Benchmark the simulation core and optionally check for regressions against a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Run the full scaling matrix")
+        parser.add_argument('--only', choices=['sim', 'buffer', 'startup'])
+        parser.add_argument('--steps', type=int, default=2000, help="Steps per simulation case")
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--output', help="Write results as JSON to this file")
+        parser.add_argument('--baseline',
+                            help="JSON results recorded on this host to compare against, "
+                                 "e.g. benchmarks/baseline.json on the reference machine")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Fail when a rate drops more than this fraction below the baseline")
+
+    def handle(self, *args, **opts):
+        baseline = None
+        if opts['baseline']:
+            try:
+                with open(opts['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, json.JSONDecodeError) as exc:
+                raise CommandError(f"Cannot read baseline {opts['baseline']}: {exc}")
+
+        def progress(i, total, name):
+            print(f"[{i + 1}/{total}] {name}", file=sys.stderr, flush=True)
+
+        results = run_benchmarks(
+            scale='full' if opts['full'] else 'quick',
+            steps=opts['steps'],
+            repeat=opts['repeat'],
+            only=opts['only'],
+            progress=progress,
+        )
+
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+        table = pd.DataFrame.from_dict(results['results'], orient='index')
+        print(table.to_string(float_format=lambda x: f"{x:,.3f}" if abs(x) < 10 else f"{x:,.1f}"))
+
+        if baseline is None:
+            return
+
+        recorded = baseline.get('meta', {})
+        differs = [key for key in HOST_KEYS if recorded.get(key) != results['meta'][key]]
+        if differs:
+            self.stderr.write(
+                f"Skipping the baseline check: {opts['baseline']} was recorded with a different "
+                + ', '.join(f"{key} ({recorded.get(key)})" for key in differs)
+            )
+            return
+
+        regressions = compare(results, baseline, opts['threshold'])
+        if regressions:
+            print("\nRegressions:")
+            for case, metric, before, after, change in regressions:
+                print(f"  {case} {metric}: {before:,.1f} -> {after:,.1f} ({change:+.1%})")
+            raise CommandError(f"{len(regressions)} benchmark(s) slower than baseline by more than {opts['threshold']:.0%}")
+
+        print(f"\nNo regressions beyond {opts['threshold']:.0%} against {opts['baseline']}")
@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management import BaseCommand, CommandError
+
+from ...arguments import add_simulation_arguments, simulation_params
+from ...comparison import COMPARABLE, METRICS, compare, parse_variant
+from ...reporting import print_comparison
+
+
+class Command(BaseCommand):
+    help = "Compare two configurations by paired replications with common random numbers."
+
+    def add_arguments(self, parser):
+        add_simulation_arguments(parser)
+        parser.add_argument('--a', nargs='+', default=[], metavar='NAME=VALUE',
+                            help="Overrides of configuration A (default: the options above as given)")
+        parser.add_argument('--b', nargs='+', required=True, metavar='NAME=VALUE',
+                            help="Overrides of configuration B, such as operators=4 or buffer-size=5")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--replications', type=int, default=10)
+        parser.add_argument(
+            '--precision', type=float, default=None,
+            help="Add replications until the relative CI half-width of every difference is below this",
+        )
+        parser.add_argument('--max-replications', type=int, default=1000)
+        parser.add_argument('--level', type=float, default=0.95)
+        parser.add_argument('--metrics', nargs='+', default=list(METRICS), choices=COMPARABLE)
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--no-crn', action='store_true',
+                            help="Run the two configurations with independent random numbers")
+        parser.add_argument('--antithetic', action='store_true',
+                            help="Also average every run with its antithetic twin")
+
+    def handle(self, *args, **opts):
+        try:
+            base = simulation_params(opts)
+            params_a = {**base, **parse_variant(opts['a'])}
+            params_b = {**base, **parse_variant(opts['b'])}
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        def progress(result):
+            print(f"\r{result['replications']} replications", end='', file=sys.stderr, flush=True)
+
+        result = compare(
+            params_a, params_b,
+            replications=opts['replications'],
+            seed=opts['seed'],
+            crn=not opts['no_crn'],
+            antithetic=opts['antithetic'],
+            precision=opts['precision'],
+            max_replications=opts['max_replications'],
+            metrics=tuple(opts['metrics']),
+            level=opts['level'],
+            workers=opts['workers'],
+            progress=progress,
+        )
+        print(file=sys.stderr)
+        print_comparison(result)
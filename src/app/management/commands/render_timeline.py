@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management import BaseCommand, CommandError
+
+from ...timeline import DEFAULT_WIDTH, render_trace
+from ...trace import TraceReader
+
+
+class Command(BaseCommand):
+    help = "Draw the ОД3 timing diagram of a recorded trace as SVG or PNG."
+
+    def add_arguments(self, parser):
+        parser.add_argument('trace')
+        parser.add_argument('output', help="Diagram file, .svg or .png")
+        parser.add_argument('--from', dest='start', type=float, default=None, help="Window start (default 0)")
+        parser.add_argument('--to', dest='end', type=float, default=None, help="Window end (default end of run)")
+        parser.add_argument('--width', type=int, default=DEFAULT_WIDTH, help="Diagram width in pixels")
+
+    def handle(self, *args, **opts):
+        try:
+            reader = TraceReader(opts['trace'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read trace {opts['trace']}: {exc}")
+
+        if opts['width'] < 1:
+            raise CommandError("--width must be positive")
+        try:
+            timeline = render_trace(reader, opts['start'], opts['end'], opts['width'])
+        except ValueError as exc:
+            raise CommandError(exc)
+        timeline.save(opts['output'])
+
+        spans = sum(len(lane.spans) for lane in timeline.slots + timeline.devices)
+        print(f"{opts['output']}: {len(timeline.lanes())} lanes, {spans} spans", file=sys.stderr)
@@ -0,0 +1,42 @@
+from django.core.management import BaseCommand, CommandError
+
+from ...reporting import print_summary
+from ...trace import TraceReader, format_state
+
+
+class Command(BaseCommand):
+    help = "Analyze a recorded simulation trace or replay its state at given instants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('trace')
+        parser.add_argument('--at', type=float, nargs='+', help="Print buffer and device state at these times")
+        parser.add_argument(
+            '--timeline', type=float, nargs=3, metavar=('FROM', 'TO', 'STEP'),
+            help="Print the state every STEP time units between FROM and TO",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            reader = TraceReader(opts['trace'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read trace {opts['trace']}: {exc}")
+
+        times = list(opts['at'] or [])
+        if opts['timeline']:
+            start, stop, step = opts['timeline']
+            if step <= 0:
+                raise CommandError("--timeline STEP must be positive")
+            n = int((stop - start) / step + 1e-9) + 1
+            times += [start + i * step for i in range(n)]
+
+        if not times:
+            s = reader.analyze()
+            print(f"Событий в трассе: {len(reader)}\n")
+            print_summary(reader.end_time, s, s['avg_waiting_time'], s['avg_service_time'])
+            return
+
+        print(f"{'t':>8} | Buffer{' ' * 31} | Operators")
+        print("-" * 100)
+        for t in sorted(times):
+            buffer, devices = format_state(reader.state_at(t))
+            print(f"{t:8.2f} | {buffer:37} | {devices}")
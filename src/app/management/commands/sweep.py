@@ -0,0 +1,109 @@
+import sys
+from math import inf
+
+import pandas as pd
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from ...arguments import add_simulation_arguments, simulation_params
+from ...cache import ResultCache
+from ...sweep import analytic_point, grid_points, parse_axis, parse_condition, run_sweep, validation_report
+
+
+class Command(BaseCommand):
+    help = "Run a grid of simulation configurations and collect one results table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grid', nargs='+', required=True,
+            help="Axes such as lambda=0.5,1,2 or operators=1:8 (inclusive range, optional :step)",
+        )
+        add_simulation_arguments(parser)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--replications', type=int, default=1)
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--cache-dir', default=str(settings.BASE_DIR / '.sweep_cache'))
+        parser.add_argument('--no-cache', action='store_true')
+        parser.add_argument('--output', help="Write the table to a .csv or .parquet file")
+        parser.add_argument(
+            '--precision', type=float, default=None,
+            help="Run each point until the relative CI half-width of the rejection percentage and mean "
+                 "waiting time is below this (warm-up removed); --duration becomes an optional cap",
+        )
+        parser.add_argument('--max-wall-time', type=float, default=None,
+                            help="With --precision: wall-clock budget per point in seconds")
+        parser.add_argument(
+            '--prescreen', nargs='+', default=None, metavar='CONDITION',
+            help="Only simulate points whose analytic estimates satisfy every condition, such as "
+                 "rejection_percent>=1 rejection_percent<=30; the other rows keep the estimates",
+        )
+        parser.add_argument('--analytic-only', action='store_true',
+                            help="Fill the table from the analytic queueing model without simulating")
+        parser.add_argument('--validate', action='store_true',
+                            help="Add analytic_* columns and print the errors of the analytic model")
+
+    def handle(self, *args, **opts):
+        try:
+            axes = [parse_axis(spec) for spec in opts['grid']]
+            prescreen = [parse_condition(spec) for spec in opts['prescreen']] if opts['prescreen'] else None
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        base = simulation_params(opts)
+        if opts['precision'] is not None and opts['duration'] is None:
+            base['duration'] = inf
+        points = grid_points(base, axes)
+
+        if opts['analytic_only']:
+            if prescreen or opts['validate']:
+                raise CommandError("--analytic-only cannot be combined with --prescreen or --validate")
+            self.write_table([{**config, **analytic_point(config)} for config in points], opts['output'])
+            print(f"{len(points)} points estimated analytically", file=sys.stderr)
+            return
+
+        cache = None if opts['no_cache'] else ResultCache(opts['cache_dir'])
+
+        def progress(done, total):
+            print(f"\r{done}/{total}", end='', file=sys.stderr, flush=True)
+
+        rows = run_sweep(
+            points,
+            seed=opts['seed'],
+            replications=opts['replications'],
+            workers=opts['workers'],
+            cache=cache,
+            progress=progress,
+            precision=opts['precision'],
+            max_wall_time=opts['max_wall_time'],
+            prescreen=prescreen,
+            analytic=opts['validate'],
+        )
+        print(file=sys.stderr)
+
+        self.write_table(rows, opts['output'])
+
+        screened = sum(row.get('screened', False) for row in rows)
+        computed = sum(not row['cached'] for row in rows) - screened
+        print(
+            f"{len(rows)} points, {computed} computed, {len(rows) - computed - screened} from cache"
+            + (f", {screened} screened out analytically" if prescreen else ""),
+            file=sys.stderr,
+        )
+
+        if opts['validate']:
+            print("\nAnalytic model against simulation:", file=sys.stderr)
+            print(pd.DataFrame(validation_report(rows)).to_string(index=False), file=sys.stderr)
+
+    @staticmethod
+    def write_table(rows, output):
+        df = pd.DataFrame(rows)
+
+        if not output:
+            print(df.to_string(index=False))
+        elif output.endswith('.parquet'):
+            try:
+                df.to_parquet(output, index=False)
+            except ImportError as exc:
+                raise CommandError(f"Parquet output needs pyarrow or fastparquet: {exc}")
+        else:
+            df.to_csv(output, index=False)
@@ -0,0 +1,148 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def sources_from_researchers(apps, schema_editor):
+    """Give reports saved under the old schema a Source per researcher name."""
+    Report = apps.get_model('app', 'Report')
+    Source = apps.get_model('app', 'Source')
+
+    for name in Report.objects.values_list('researcher_name', flat=True).distinct():
+        source = Source.objects.create(name=name)
+        Report.objects.filter(researcher_name=name).update(source=source)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('engine', models.CharField(default='tick', max_length=10)),
+                ('engine_version', models.IntegerField()),
+                ('num_sources', models.IntegerField()),
+                ('lambda_rate', models.FloatField()),
+                ('duration', models.FloatField()),
+                ('delta', models.FloatField()),
+                ('buffer_size', models.IntegerField()),
+                ('num_devices', models.IntegerField()),
+                ('arrivals', models.CharField(default='uniform', max_length=20)),
+                ('service', models.CharField(default='uniform', max_length=20)),
+                ('seed', models.BigIntegerField(blank=True, null=True)),
+                ('generated', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('rejection_percent', models.FloatField(default=0.0)),
+                ('summary', models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='busy_time',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='processed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='utilization_percent',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='end_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='start_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='submitted_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='submitted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='device',
+            name='name',
+            field=models.CharField(default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='buffer',
+            name='run',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='buffer', to='app.simulationrun'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='devices', to='app.simulationrun'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='app.simulationrun'),
+        ),
+        migrations.CreateModel(
+            name='Source',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('generated', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('avg_waiting_time', models.FloatField(default=0.0)),
+                ('avg_service_time', models.FloatField(default=0.0)),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='app.simulationrun')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='source',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='app.source'),
+        ),
+        migrations.RunPython(sources_from_researchers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='report',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='app.source'),
+        ),
+        migrations.RemoveField(
+            model_name='report',
+            name='description',
+        ),
+        migrations.RemoveField(
+            model_name='report',
+            name='researcher_name',
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['run', 'source'], name='report_run_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['run', 'priority'], name='report_run_priority_idx'),
+        ),
+    ]
@@ -1,14 +1,47 @@
-from datetime import datetime
-
 from django.db import models
+from django.utils import timezone
+
+
+class SimulationRun(models.Model):
+    """Parameters, seed and summary of one persisted simulation run."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    engine = models.CharField(max_length=10, default='tick')
+    engine_version = models.IntegerField()
+    num_sources = models.IntegerField()
+    lambda_rate = models.FloatField()
+    duration = models.FloatField()
+    delta = models.FloatField()
+    buffer_size = models.IntegerField()
+    num_devices = models.IntegerField()
+    arrivals = models.CharField(max_length=20, default='uniform')
+    service = models.CharField(max_length=20, default='uniform')
+    seed = models.BigIntegerField(null=True, blank=True)
+
+    generated = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    rejection_percent = models.FloatField(default=0.0)
+    summary = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"SimulationRun({self.id}, {self.created_at:%Y-%m-%d %H:%M})"
 
 
 class Source(models.Model):
+    run = models.ForeignKey(SimulationRun, on_delete=models.CASCADE, related_name='sources', null=True, blank=True)
     name = models.CharField(max_length=50)
-
-    generated_count = 0
-    rejected_count = 0
-    completed_reports = []
+    generated = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    avg_waiting_time = models.FloatField(default=0.0)
+    avg_service_time = models.FloatField(default=0.0)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generated_count = 0
+        self.rejected_count = 0
+        self.completed_reports = []
 
     def __str__(self):
         return self.name
@@ -17,25 +50,39 @@ class Source(models.Model):
 class Report(models.Model):
     PRIORITY_CHOICES = [(i, f"Priority {i}") for i in range(1, 6)]
 
+    run = models.ForeignKey(SimulationRun, on_delete=models.CASCADE, related_name='reports', null=True, blank=True)
     source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name='reports')
+    number = models.IntegerField(null=True, blank=True)
     priority = models.IntegerField(choices=PRIORITY_CHOICES, default=3)
     status = models.CharField(max_length=20, default="pending")
-    submitted_at = models.DateTimeField(default=datetime.now)
+    submitted_at = models.DateTimeField(default=timezone.now)
+
+    submitted_time = models.FloatField(null=True, blank=True)
+    start_time = models.FloatField(null=True, blank=True)
+    end_time = models.FloatField(null=True, blank=True)
 
-    submitted_time: float = None
-    start_time: float = None
-    end_time: float = None
+    class Meta:
+        indexes = [
+            models.Index(fields=['run', 'source'], name='report_run_source_idx'),
+            models.Index(fields=['run', 'priority'], name='report_run_priority_idx'),
+        ]
 
     def __str__(self):
         return f"Report({self.id}, source={self.source}, p={self.priority}, {self.status})"
 
 
 class Device(models.Model):
+    run = models.ForeignKey(SimulationRun, on_delete=models.CASCADE, related_name='devices', null=True, blank=True)
     name = models.CharField(max_length=50, default="")
     busy_until = models.FloatField(default=0.0)
+    busy_time = models.FloatField(default=0.0)
+    processed = models.IntegerField(default=0)
+    utilization_percent = models.FloatField(default=0.0)
 
-    total_busy_time = 0.0
-    processed_count = 0
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.total_busy_time = 0.0
+        self.processed_count = 0
 
     def is_free(self, clock: float):
         return self.busy_until <= clock
@@ -46,8 +93,12 @@ class Device(models.Model):
 
 
 class Buffer(models.Model):
+    run = models.OneToOneField(SimulationRun, on_delete=models.CASCADE, related_name='buffer', null=True, blank=True)
     size = models.IntegerField(default=10)
-    _queue = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queue = []
 
     @property
     def queue(self):
@@ -77,10 +128,10 @@ class Buffer(models.Model):
             return []
 
         if batch_by_source:
-            source_id = self._queue[0].source_id
-            batch = [r for r in self._queue if r.source_id == source_id]
+            source = self._queue[0].source
+            batch = [r for r in self._queue if r.source is source]
         else:
-            batch = [self._queue.pop(0)]
+            batch = [self._queue[0]]
 
         for r in batch:
             self._queue.remove(r)
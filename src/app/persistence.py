@@ -0,0 +1,63 @@
+"""Saving finished simulation runs to the database.
+
+A run is written in one transaction: the ``SimulationRun`` row, its sources,
+devices and buffer, then the completed reports in ``bulk_create`` batches of
+``batch_size``. Report models are built one chunk at a time, so saving a run
+never holds more than one chunk of unsaved models in memory.
+"""
+from itertools import islice
+
+from django.db import transaction
+
+from .adapters import buffer_to_model, device_to_model, report_to_model, source_to_model
+from .models import Device, Report, SimulationRun, Source
+from .simulation import ENGINE_VERSION
+
+BATCH_SIZE = 5000
+
+
+def save_run(sim, params, seed=None, batch_size=BATCH_SIZE):
+    """Persist a finished ``Simulation`` and return its ``SimulationRun``.
+
+    ``params`` are the ``Simulation`` keyword arguments the run was created
+    with. Reports are only available when the simulation was created with
+    ``retain_reports=True``; otherwise only the run and its statistics are
+    stored.
+    """
+    summary = sim.summary()
+
+    with transaction.atomic():
+        run = SimulationRun.objects.create(
+            engine=params.get('engine', 'tick'),
+            engine_version=ENGINE_VERSION,
+            num_sources=params['num_sources'],
+            lambda_rate=params['lambda_rate'],
+            duration=params['duration'],
+            delta=params['delta'],
+            buffer_size=params['buffer_size'],
+            num_devices=params['num_devices'],
+            arrivals=params.get('arrivals', 'uniform'),
+            service=params.get('service', 'uniform'),
+            seed=seed,
+            generated=summary['generated'],
+            completed=summary['completed'],
+            rejected=summary['rejected'],
+            rejection_percent=summary['rejection_percent'],
+            summary=summary,
+        )
+
+        sources = Source.objects.bulk_create(
+            [source_to_model(s, run) for s in sim.sources], batch_size=batch_size,
+        )
+        Device.objects.bulk_create(
+            [device_to_model(d, sim.clock, run) for d in sim.devices], batch_size=batch_size,
+        )
+        buffer_to_model(sim.buffer, run).save()
+
+        reports = iter(sim.completed_reports)
+        while chunk := list(islice(reports, batch_size)):
+            Report.objects.bulk_create(
+                [report_to_model(r, sources[r.source.index], run) for r in chunk], batch_size=batch_size,
+            )
+
+    return run
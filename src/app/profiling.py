@@ -0,0 +1,113 @@
+"""Opt-in instrumentation of the simulation hot path.
+
+Nothing here is touched unless a ``PhaseProfiler`` is passed to
+``Simulation(profiler=...)``: the profiler then replaces the instrumented
+methods on that one instance with timing wrappers, so an uninstrumented
+simulation runs exactly the same code as before.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+# Simulation methods timed as phases. Phases nest: ``step`` contains the
+# others, and ``generate_report``/``process_devices`` contain the buffer calls.
+SIMULATION_PHASES = ('step', 'generate_report', 'process_devices')
+BUFFER_PHASES = ('enqueue', 'pull_tasks')
+
+
+class PhaseProfiler:
+    def __init__(self):
+        self.phases = {}
+        self.evictions = 0
+        self.rejections = 0
+        self.batch_sizes = Counter()
+        self.queue_lengths = Counter()
+
+    def _add(self, name, elapsed):
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [1, elapsed]
+        else:
+            phase[0] += 1
+            phase[1] += elapsed
+
+    def wrap(self, name, fn):
+        clock = time.perf_counter
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(name, clock() - started)
+
+        return timed
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - started)
+
+    def instrument(self, sim):
+        """Install timing and counting wrappers on ``sim`` and its buffer."""
+        for name in SIMULATION_PHASES:
+            setattr(sim, name, self.wrap(name, getattr(sim, name)))
+
+        buffer = sim.buffer
+        enqueue = self.wrap('buffer.enqueue', buffer.enqueue)
+        pull_tasks = self.wrap('buffer.pull_tasks', buffer.pull_tasks)
+
+        def counted_enqueue(report):
+            successful, replaced = result = enqueue(report)
+            if replaced is not None:
+                self.evictions += 1
+            elif not successful:
+                self.rejections += 1
+            return result
+
+        def counted_pull_tasks(device, batch_by_source=True):
+            batch = pull_tasks(device, batch_by_source)
+            self.batch_sizes[len(batch)] += 1
+            return batch
+
+        buffer.enqueue = counted_enqueue
+        buffer.pull_tasks = counted_pull_tasks
+
+        step = sim.step
+
+        def counted_step():
+            events = step()
+            self.queue_lengths[len(buffer)] += 1
+            return events
+
+        sim.step = counted_step
+
+    def as_dict(self):
+        return {
+            'phases': {
+                name: {'calls': calls, 'seconds': seconds}
+                for name, (calls, seconds) in self.phases.items()
+            },
+            'evictions': self.evictions,
+            'rejections': self.rejections,
+            'batch_sizes': log2_histogram(self.batch_sizes),
+            'queue_lengths': log2_histogram(self.queue_lengths),
+        }
+
+
+def log2_histogram(counter):
+    """Fold exact value counts into power-of-two bins: 0, 1, 2-3, 4-7, ..."""
+    bins = Counter()
+    for value, count in counter.items():
+        low = 1 << (value.bit_length() - 1) if value > 0 else 0
+        bins[low] += count
+
+    return {
+        (str(low) if low < 2 else f"{low}-{2 * low - 1}"): bins[low]
+        for low in sorted(bins)
+    }
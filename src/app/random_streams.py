@@ -0,0 +1,85 @@
+import numpy as np
+from numpy.random import SeedSequence, default_rng
+
+STREAMS = ('arrivals', 'sources', 'priorities', 'service')
+
+# How variates are produced from each stream: numpy's own samplers, or by
+# inverting the distribution function at u (``inverse``) or at 1 - u
+# (``antithetic``). An ``inverse`` and an ``antithetic`` run with the same
+# seed form an antithetic pair.
+SAMPLING = ('native', 'inverse', 'antithetic')
+
+# Largest double below 1, keeps the inverse of the exponential finite.
+_BELOW_ONE = np.nextafter(1.0, 0.0)
+
+
+class RandomStreams:
+    """Independent random number streams of one simulation run.
+
+    Each random choice of the model (arrival process, source pick, priority and
+    service time) draws from its own ``numpy.random.Generator``, all derived
+    from a single ``SeedSequence``. Runs with the same seed are therefore
+    reproducible, and replications seeded with spawned sequences are
+    statistically independent wherever they execute.
+    """
+
+    def __init__(self, seed=None, sampling='native'):
+        if sampling not in SAMPLING:
+            raise ValueError(f"Unknown sampling {sampling!r}, expected one of {SAMPLING}")
+        self.seed_sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        self.sampling = sampling
+
+        for name, child in zip(STREAMS, self.seed_sequence.spawn(len(STREAMS))):
+            generator = default_rng(child)
+            if sampling != 'native':
+                generator = InverseTransform(generator, antithetic=sampling == 'antithetic')
+            setattr(self, name, generator)
+
+
+class InverseTransform:
+    """The ``Generator`` methods used by the model, sampled by CDF inversion.
+
+    Every variate is a monotone function of one uniform ``u`` (or ``1 - u``
+    when ``antithetic``), which is what makes antithetic pairs negatively
+    correlated. Slower than numpy's samplers, so only used when asked for.
+    """
+
+    def __init__(self, generator, antithetic=False):
+        self.generator = generator
+        self.antithetic = antithetic
+        self._poisson_cdf = {}
+
+    @property
+    def bit_generator(self):
+        return self.generator.bit_generator
+
+    def random(self, n):
+        u = self.generator.random(n)
+        return np.minimum(1.0 - u, _BELOW_ONE) if self.antithetic else u
+
+    def integers(self, low, high, n):
+        return low + np.minimum((self.random(n) * (high - low)).astype(np.int64), high - low - 1)
+
+    def uniform(self, low, high, n):
+        return low + (high - low) * self.random(n)
+
+    def exponential(self, scale, n):
+        return -scale * np.log1p(-self.random(n))
+
+    def poisson(self, lam, n):
+        cdf = self._poisson_cdf.get(lam)
+        if cdf is None:
+            cdf = self._poisson_cdf[lam] = _poisson_cdf(lam)
+        return np.searchsorted(cdf, self.random(n), side='right')
+
+
+def _poisson_cdf(lam):
+    """Cumulative Poisson probabilities up to where the tail is negligible."""
+    if lam <= 0:
+        return np.ones(1)
+    size = int(lam + 12 * np.sqrt(lam) + 20)
+    k = np.arange(1, size)
+    log_pmf = np.concatenate(([-lam], -lam + np.cumsum(np.log(lam) - np.log(k))))
+    cdf = np.cumsum(np.exp(log_pmf))
+    cdf[-1] = 1.0
+    return cdf
@@ -0,0 +1,60 @@
+"""Plain-Python records used by the simulation hot path.
+
+They mirror the fields of the Django models in ``models.py`` but carry no ORM
+machinery, so creating one costs a single slotted allocation and the
+simulation runs without ``django.setup()``. See ``adapters.py`` for the
+conversion to models when a run is persisted.
+"""
+
+from .statistics import ReportStats
+
+
+class Source:
+    __slots__ = ('index', 'name', 'generated_count', 'rejected_count', 'completed_reports', 'stats')
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+        self.generated_count = 0
+        self.rejected_count = 0
+        self.completed_reports = []
+        self.stats = ReportStats()
+
+    def __str__(self):
+        return self.name
+
+
+class Report:
+    __slots__ = ('id', 'source', 'priority', 'status', 'submitted_time', 'start_time', 'end_time', 'service_time')
+
+    def __init__(self, id, source, priority, submitted_time, service_time=None):
+        self.id = id
+        self.source = source
+        self.priority = priority
+        self.status = "pending"
+        self.submitted_time = submitted_time
+        self.start_time = None
+        self.end_time = None
+        # Drawn on arrival with common random numbers, see ``Simulation``.
+        self.service_time = service_time
+
+    def __str__(self):
+        return f"Report({self.id}, source={self.source}, p={self.priority}, {self.status})"
+
+
+class Device:
+    __slots__ = ('index', 'name', 'busy_until', 'total_busy_time', 'processed_count')
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+        self.busy_until = 0.0
+        self.total_busy_time = 0.0
+        self.processed_count = 0
+
+    def is_free(self, clock: float):
+        return self.busy_until <= clock
+
+    def add_busy_time(self, time: float):
+        self.total_busy_time += time
+        self.processed_count += 1
@@ -0,0 +1,306 @@
+"""Console tables of simulation results (ОР1).
+
+pandas is imported inside the functions: it is only needed once the tables
+are printed, and importing it dominates the start-up of short runs.
+"""
+
+
+def print_summary(duration, s, avg_wait, avg_service):
+    """Print the summary, per-source and per-device tables of a run."""
+    import pandas as pd
+
+    summary_data = {
+        'Показатель': [
+            'Общее время',
+            'Сгенерировано',
+            'Завершено',
+            'Отклонено',
+            'Процент отказа в системе',
+            'Среднее время ожидания',
+            'Среднее время обслуживания',
+            'Среднее время в системе'
+        ],
+        'Значение': [
+            f"{duration:.2f}",
+            f"{s['generated']}",
+            f"{s['completed']}",
+            f"{s['rejected']}",
+            f"{s['rejection_percent']:.2f}",
+            f"{avg_wait:.2f}",
+            f"{avg_service:.2f}",
+            f"{avg_service + avg_wait:.2f}"
+        ]
+    }
+
+    summary_df = pd.DataFrame(summary_data)
+
+    sources_data = []
+    for source_stat in s['sources']:
+        sources_data.append({
+            'Источник |': f"{source_stat['source']} |",
+            'Сгенерировано |': f"{source_stat['generated']} |",
+            'Отклонено |': f"{source_stat['rejected']} |",
+            'P отказа |': f"{source_stat['rejection_percent']:.2f} |",
+            'T ожидания |': f"{source_stat['avg_waiting_time']:.2f} |",
+            'T обслуживания |': f"{source_stat['avg_service_time']:.2f} |",
+            'T в системе |': f"{source_stat['avg_service_time'] + source_stat['avg_waiting_time']:.2f} |"
+        })
+
+    sources_df = pd.DataFrame(sources_data)
+
+    devices_data = []
+    for device_stat in s['devices']:
+        devices_data.append({
+            'Прибор |': f"{device_stat['device']} |",
+            'Время работы |': f"{device_stat['total_busy_time']:.2f} |",
+            'Обработано |': f"{device_stat['processed_count']} |",
+            'P загруженности |': f"{device_stat['utilization_percent']:.2f} |"
+        })
+
+    devices_df = pd.DataFrame(devices_data)
+
+    print("Итоги симуляции:")
+    print(summary_df.to_string(index=False))
+
+    print("\n\nСтатистика по источникам:")
+    print(sources_df.to_string(index=False))
+
+    print("\n\nСтатистика по приборам:")
+    print(devices_df.to_string(index=False))
+
+
+def print_profile(profile):
+    """Print the per-phase breakdown collected by ``PhaseProfiler``."""
+    import pandas as pd
+
+    phases = profile['phases']
+    step_time = phases.get('step', {}).get('seconds', 0.0)
+
+    phases_df = pd.DataFrame([
+        {
+            'Фаза |': f"{name} |",
+            'Вызовов |': f"{phase['calls']} |",
+            'Время, с |': f"{phase['seconds']:.4f} |",
+            'мкс/вызов |': f"{phase['seconds'] / phase['calls'] * 1e6:.2f} |",
+            '% шага |': f"{phase['seconds'] / step_time * 100:.1f} |" if step_time and name != 'render' else "- |",
+        }
+        for name, phase in phases.items()
+    ])
+
+    print("\n\nПрофиль выполнения:")
+    print(phases_df.to_string(index=False))
+    print(f"\nВытеснено из буфера: {profile['evictions']}, отклонено при поступлении: {profile['rejections']}")
+
+    for title, histogram in (('Размер пакета', profile['batch_sizes']),
+                             ('Длина очереди после шага', profile['queue_lengths'])):
+        print(f"\n{title}:")
+        print(pd.DataFrame({'Диапазон': list(histogram), 'Количество': list(histogram.values())})
+              .to_string(index=False))
+
+
+def print_replications(duration, results):
+    """Print the run tables of aggregated replications as mean ± CI."""
+    import pandas as pd
+
+    def ci(value, digits=2):
+        mean, half_width = value
+        return f"{mean:.{digits}f} ± {half_width:.{digits}f}"
+
+    summary_df = pd.DataFrame({
+        'Показатель': [
+            'Общее время',
+            'Прогонов',
+            'Сгенерировано',
+            'Завершено',
+            'Отклонено',
+            'Процент отказа в системе',
+            'Среднее время ожидания',
+            'Среднее время обслуживания',
+            'Среднее время в системе'
+        ],
+        'Значение': [
+            f"{duration:.2f}",
+            f"{results['replications']}",
+            ci(results['generated'], 1),
+            ci(results['completed'], 1),
+            ci(results['rejected'], 1),
+            ci(results['rejection_percent']),
+            ci(results['avg_waiting_time']),
+            ci(results['avg_service_time']),
+            ci(results['avg_sojourn_time']),
+        ]
+    })
+
+    sources_df = pd.DataFrame([
+        {
+            'Источник |': f"{source_stat['source']} |",
+            'Сгенерировано |': f"{ci(source_stat['generated'], 1)} |",
+            'Отклонено |': f"{ci(source_stat['rejected'], 1)} |",
+            'P отказа |': f"{ci(source_stat['rejection_percent'])} |",
+            'T ожидания |': f"{ci(source_stat['avg_waiting_time'])} |",
+            'T обслуживания |': f"{ci(source_stat['avg_service_time'])} |",
+            'T в системе |': f"{ci(source_stat['avg_sojourn_time'])} |"
+        }
+        for source_stat in results['sources']
+    ])
+
+    devices_df = pd.DataFrame([
+        {
+            'Прибор |': f"{device_stat['device']} |",
+            'Время работы |': f"{ci(device_stat['total_busy_time'])} |",
+            'Обработано |': f"{ci(device_stat['processed_count'], 1)} |",
+            'P загруженности |': f"{ci(device_stat['utilization_percent'])} |"
+        }
+        for device_stat in results['devices']
+    ])
+
+    print("Итоги симуляции (среднее ± 95% доверительный интервал):")
+    print(summary_df.to_string(index=False))
+
+    print("\n\nСтатистика по источникам:")
+    print(sources_df.to_string(index=False))
+
+    print("\n\nСтатистика по приборам:")
+    print(devices_df.to_string(index=False))
+
+
+def print_shards(shards):
+    """Print the per-shard table of a ``ShardedSimulation`` run."""
+    import pandas as pd
+
+    shards_df = pd.DataFrame([
+        {
+            'Буфер |': f"{shard['shard']} |",
+            'Сгенерировано |': f"{shard['generated']} |",
+            'Завершено |': f"{shard['completed']} |",
+            'Отклонено |': f"{shard['rejected']} |",
+            'P отказа |': f"{shard['rejection_percent']:.2f} |",
+            'T ожидания |': f"{shard['avg_waiting_time']:.2f} |",
+        }
+        for shard in shards
+    ])
+
+    print("\n\nСтатистика по буферам:")
+    print(shards_df.to_string(index=False))
+
+
+METRIC_NAMES = {
+    'rejection_percent': 'Процент отказа в системе',
+    'avg_waiting_time': 'Среднее время ожидания',
+    'avg_sojourn_time': 'Среднее время в системе',
+    'queue_length': 'Средняя длина очереди',
+    'avg_service_time': 'Среднее время обслуживания',
+    'p95_waiting_time': '95-й процентиль ожидания',
+    'utilization_percent': 'Загрузка приборов, %',
+}
+
+STOP_REASONS = {
+    'precision': 'достигнута заданная точность',
+    'wall_time': 'исчерпан бюджет времени',
+    'duration': 'достигнута длительность моделирования',
+    'idle': 'больше нет событий',
+}
+
+
+def print_sequential(result):
+    """Print the run tables and the batch-means estimates of a sequential run."""
+    import pandas as pd
+
+    s = result['summary']
+    print_summary(result['clock'], s, s['waiting_time']['mean'], s['service_time']['mean'])
+
+    estimates_df = pd.DataFrame([
+        {
+            'Показатель |': f"{METRIC_NAMES[name]} |",
+            'Оценка |': f"{m['estimate']:.4f} |",
+            'Полуширина ДИ |': f"{m['half_width']:.4f} |",
+            'Отн. точность |': f"{m['relative'] * 100:.2f}% |",
+        }
+        for name, m in result['metrics'].items()
+    ])
+
+    print(f"\n\nОценки после разгона ({result['level'] * 100:.0f}% ДИ, {result['batches']} пакетов):")
+    print(estimates_df.to_string(index=False))
+    print(
+        f"\nРазгон: {result['warmup']:.2f}, окон: {result['windows']} по {result['window']:.2f}, "
+        f"время счёта: {result['wall_time']:.2f} с"
+    )
+    print(f"Остановка: {STOP_REASONS[result['reason']]} (цель {result['precision'] * 100:.2f}%)")
+
+
+def print_analytic(params, a):
+    """Print the queueing-model estimates of ``analytic.estimate``."""
+    import pandas as pd
+
+    summary_df = pd.DataFrame({
+        'Показатель': [
+            'Загрузка (λ / cμ)',
+            'Процент отказа в системе',
+            'Средняя длина очереди',
+            'Среднее время ожидания',
+            'Среднее время обслуживания',
+            'Среднее время в системе',
+            'P загруженности приборов',
+            'Пропускная способность',
+        ],
+        'Значение': [
+            f"{a['load']:.3f}",
+            f"{a['rejection_percent']:.2f}",
+            f"{a['queue_length']:.3f}",
+            f"{a['avg_waiting_time']:.2f}",
+            f"{a['avg_service_time']:.2f}",
+            f"{a['avg_sojourn_time']:.2f}",
+            f"{a['utilization_percent']:.2f}",
+            f"{a['throughput']:.3f}",
+        ]
+    })
+
+    priorities_df = pd.DataFrame([
+        {'Приоритет |': f"{priority} |", 'P отказа |': f"{value:.2f} |"}
+        for priority, value in a['priority_rejection_percent'].items()
+    ])
+
+    print("Аналитическая оценка:")
+    print(summary_df.to_string(index=False))
+
+    print("\n\nОтказы по приоритетам (приближение Д1ОО2):")
+    print(priorities_df.to_string(index=False))
+
+    if a['exact']:
+        print("\nМодель точна (один источник, пуассоновский поток, экспоненциальное обслуживание) "
+              "для отказов, очереди и загрузки; время ожидания и пребывания приближённые.")
+    else:
+        print(
+            f"\nПриближение: поток '{params['arrivals']}' и обслуживание '{params['service']}' "
+            f"заменены пуассоновским и экспоненциальным с теми же средними, "
+            f"пакеты нескольких источников оценены биномиально."
+        )
+
+
+def print_comparison(result):
+    """Print the paired differences of ``comparison.compare``."""
+    import pandas as pd
+
+    comparison_df = pd.DataFrame([
+        {
+            'Показатель |': f"{METRIC_NAMES[name]} |",
+            'A |': f"{m['a']:.4f} |",
+            'B |': f"{m['b']:.4f} |",
+            'B − A |': f"{m['difference']:+.4f} |",
+            '± |': f"{m['half_width']:.4f} |",
+            'Отн. точность |': f"{m['relative'] * 100:.2f}% |",
+            'Снижение дисперсии |': f"{m['variance_reduction']:.2f}× |",
+        }
+        for name, m in result['metrics'].items()
+    ])
+
+    methods = [name for name, used in (('общие случайные числа', result['crn']),
+                                       ('антитетические переменные', result['antithetic'])) if used]
+    print(f"Сравнение конфигураций ({result['level'] * 100:.0f}% ДИ разности, "
+          f"{result['replications']} парных прогонов):")
+    print(comparison_df.to_string(index=False))
+    print(f"\nСнижение дисперсии: {', '.join(methods) or 'нет (независимые прогоны)'}, "
+          f"заявок смоделировано: {result['reports']}")
+    if result['precision'] is not None:
+        status = 'достигнута' if result['converged'] else 'не достигнута'
+        print(f"Точность {result['precision'] * 100:.2f}% {status}")
@@ -0,0 +1,44 @@
+"""Running many simulations concurrently inside one process.
+
+A ``Simulation`` owns all of its state (records, buffer, dispatcher, random
+streams and accumulators), so independent instances can be advanced from
+different threads or asyncio tasks. A single instance must not be stepped
+from two places at once.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .simulation import Simulation
+
+SLICE_STEPS = 1000
+
+
+def run_simulation(config):
+    """Run one simulation described by ``Simulation`` keyword arguments."""
+    return Simulation(**config).run()
+
+
+def run_concurrently(configs, max_workers=None):
+    """Run the simulations in a thread pool; summaries come back in order."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run_simulation, configs))
+
+
+async def run_async(sim, slice_steps=SLICE_STEPS):
+    """Advance ``sim`` to its duration as a cooperative asyncio task.
+
+    Control returns to the event loop every ``slice_steps`` steps, so many
+    simulations and other coroutines share one loop without threads.
+    """
+    while sim.clock < sim.duration:
+        for _ in range(slice_steps):
+            if sim.clock >= sim.duration:
+                break
+            sim.step()
+        await asyncio.sleep(0)
+    return sim.summary()
+
+
+async def gather_simulations(configs, slice_steps=SLICE_STEPS):
+    """Run the simulations as concurrent asyncio tasks; summaries in order."""
+    return await asyncio.gather(*(run_async(Simulation(**c), slice_steps) for c in configs))
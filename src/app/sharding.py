@@ -0,0 +1,377 @@
+"""Sharded platform: sources routed to several buffers, one process each.
+
+A coordinator draws the arrival flow (instants, sources and priorities) one
+epoch of model time at a time and routes every arrival to a shard. A shard is
+a ``Simulation`` with its own buffer and device ring that receives its
+arrivals through ``Simulation.admit`` instead of drawing them. Shards run in
+their own worker processes; per epoch they receive their slice of the flow
+as NumPy arrays and answer with their load (reports in the buffer and busy
+devices). Only when the run ends do they send their statistics accumulators,
+which are merged into the usual ``summary()`` tables.
+
+Static routers (``hash``, ``priority``) never look at the loads, so shards
+may run up to ``LOOKAHEAD`` epochs ahead of the coordinator. ``least-loaded``
+routes each epoch on the loads reported at the end of the previous one, which
+makes every epoch a barrier.
+"""
+import math
+import multiprocessing
+from collections import deque
+
+import numpy as np
+from numpy.random import SeedSequence
+
+from .distributions import ARRIVAL_PROCESSES
+from .random_streams import RandomStreams
+from .simulation import Simulation
+from .statistics import ReportStats
+
+# Default epoch length, in ticks of ``delta``.
+EPOCH_TICKS = 50
+
+# Epochs a shard may be sent ahead of the replies read by a static router.
+LOOKAHEAD = 2
+
+PRIORITIES = 4
+
+
+class HashRouter:
+    """Every source always goes to the same shard."""
+
+    dynamic = False
+
+    def __init__(self, shards):
+        self.shards = shards
+
+    def route(self, sources, priorities, loads):
+        return sources % self.shards
+
+
+class PriorityRouter:
+    """Priority classes are split into contiguous ranges, one per shard."""
+
+    dynamic = False
+
+    def __init__(self, shards):
+        if shards > PRIORITIES:
+            raise ValueError(f"The priority router supports at most {PRIORITIES} shards")
+        self.shards = shards
+
+    def route(self, sources, priorities, loads):
+        return (priorities - 1) * self.shards // PRIORITIES
+
+
+class LeastLoadedRouter:
+    """Each arrival goes to the shard with the fewest reports, counting the
+    arrivals already routed there in the same epoch.
+
+    Loads are as reported at the end of the previous epoch; completions
+    within the epoch are not seen until the next one.
+    """
+
+    dynamic = True
+
+    def __init__(self, shards):
+        self.shards = shards
+
+    def route(self, sources, priorities, loads):
+        n = len(sources)
+        if not n:
+            return np.zeros(0, dtype=np.int64)
+        # The k-th arrival routed to shard s sees load loads[s] + k; greedy
+        # assignment hands out the n smallest of these in order.
+        keys = np.asarray(loads, dtype=float)[:, None] + np.arange(n)
+        order = np.argsort(keys, axis=None, kind='stable')[:n]
+        shard, _ = np.unravel_index(order, keys.shape)
+        return shard
+
+
+ROUTERS = {
+    'hash': HashRouter,
+    'least-loaded': LeastLoadedRouter,
+    'priority': PriorityRouter,
+}
+
+
+class ArrivalFlow:
+    """The platform's arrival flow, drawn one epoch at a time."""
+
+    def __init__(self, arrivals, num_sources, seed):
+        self.arrivals = arrivals
+        self.num_sources = num_sources
+        self.random = RandomStreams(seed)
+        self.generated = 0
+        self.clock = 0.0
+
+    def take(self, until):
+        """Arrival instants, sources and priorities in ``(clock, until]``."""
+        rate = self.arrivals.rate
+        if rate <= 0:
+            times = np.zeros(0)
+        elif self.arrivals.random:
+            n = self.random.arrivals.poisson(rate * (until - self.clock))
+            times = np.sort(self.clock + (until - self.clock) * self.random.arrivals.random(n))
+        else:
+            last = math.floor(until * rate + 1e-9)
+            times = np.arange(self.generated + 1, last + 1) / rate
+        self.generated += len(times)
+        self.clock = until
+
+        n = len(times)
+        sources = self.random.sources.integers(0, self.num_sources, n)
+        priorities = self.random.priorities.integers(1, PRIORITIES + 1, n)
+        return times, sources, priorities
+
+
+class Shard:
+    """One buffer and device ring fed with routed arrivals."""
+
+    def __init__(self, params, seed):
+        self.sim = Simulation(**{**params, 'lambda_rate': 0.0, 'duration': math.inf}, seed=seed)
+        self.tick = 0
+
+    def advance(self, until, when, sources, priorities):
+        """Admit the arrivals and run to ``until``; return the shard's load.
+
+        With the tick engine ``until`` and ``when`` are tick numbers, with the
+        event engine model times.
+        """
+        sim = self.sim
+        admit = sim.admit
+        process_devices = sim.process_devices
+        shard_sources = sim.sources
+        arrivals = zip(when.tolist(), sources.tolist(), priorities.tolist())
+
+        if sim.engine == 'tick':
+            delta = sim.delta
+            pending = next(arrivals, None)
+            for tick in range(self.tick + 1, until + 1):
+                sim.clock = tick * delta
+                while pending is not None and pending[0] <= tick:
+                    admit(shard_sources[pending[1]], pending[2])
+                    pending = next(arrivals, None)
+                process_devices()
+            self.tick = until
+        else:
+            dispatcher = sim.dispatcher
+            for time, source, priority in arrivals:
+                while dispatcher.next_completion() < time:
+                    sim.clock = dispatcher.next_completion()
+                    process_devices()
+                sim.clock = time
+                admit(shard_sources[source], priority)
+                process_devices()
+            while dispatcher.next_completion() <= until:
+                sim.clock = dispatcher.next_completion()
+                process_devices()
+            sim.clock = until
+            dispatcher.release(until)
+
+        return len(sim.buffer), sim.busy_devices()
+
+    def result(self):
+        """Compact end-of-run statistics of the shard."""
+        sim = self.sim
+        return {
+            'clock': sim.clock,
+            'generated': sim.generated,
+            'started': sim.started,
+            'completed': sim.completed,
+            'rejected': sim.rejected,
+            'stats': sim.stats,
+            'sources': [(s.generated_count, s.rejected_count, s.stats) for s in sim.sources],
+            'devices': [(d.total_busy_time, d.processed_count) for d in sim.devices],
+        }
+
+
+def _serve(connection, params, seed):
+    """Worker process: advance one shard per message until ``None`` arrives."""
+    shard = Shard(params, seed)
+    while True:
+        message = connection.recv()
+        if message is None:
+            connection.send(shard.result())
+            connection.close()
+            return
+        connection.send(shard.advance(*message))
+
+
+class _InlineShard:
+    """A shard run in the coordinator's process, behind the same interface."""
+
+    def __init__(self, params, seed):
+        self.shard = Shard(params, seed)
+        self.replies = deque()
+
+    def send(self, message):
+        self.replies.append(self.shard.result() if message is None else self.shard.advance(*message))
+
+    def recv(self):
+        return self.replies.popleft()
+
+
+class ShardedSimulation:
+    """``num_shards`` buffers and device rings fed from one arrival flow.
+
+    ``buffer_size`` and ``num_devices`` are per shard; the other parameters
+    are those of ``Simulation``. ``epoch`` is the model time between load
+    exchanges (default ``EPOCH_TICKS`` ticks). With ``parallel=False`` the
+    shards run one after another in this process.
+    """
+
+    def __init__(self, num_shards, lambda_rate, duration, delta, buffer_size, num_devices, num_sources,
+                 router='hash', engine='tick', arrivals='uniform', service='uniform', seed=None, epoch=None,
+                 parallel=True):
+        if router not in ROUTERS:
+            raise ValueError(f"Unknown router {router!r}, expected one of {', '.join(ROUTERS)}")
+        if isinstance(arrivals, str):
+            arrivals = ARRIVAL_PROCESSES[arrivals](lambda_rate)
+
+        self.num_shards = num_shards
+        self.duration = duration
+        self.delta = delta
+        self.engine = engine
+        self.router = ROUTERS[router](num_shards)
+        self.epoch = epoch or EPOCH_TICKS * delta
+        self.parallel = parallel
+
+        flow_seed, *shard_seeds = SeedSequence(seed).spawn(num_shards + 1)
+        self.flow = ArrivalFlow(arrivals, num_sources, flow_seed)
+        self.shard_params = dict(
+            delta=delta, buffer_size=buffer_size, num_devices=num_devices, num_sources=num_sources,
+            engine=engine, service=service,
+        )
+        self.shard_seeds = shard_seeds
+        self.results = None
+
+    def _epochs(self):
+        """``(model time, shard clock)`` at the end of every epoch."""
+        if self.engine == 'tick':
+            total = math.ceil(self.duration / self.delta - 1e-9)
+            step = max(1, round(self.epoch / self.delta))
+            for tick in range(step, total + step, step):
+                tick = min(tick, total)
+                yield tick * self.delta, tick
+        else:
+            k = 1
+            while True:
+                until = min(k * self.epoch, self.duration)
+                yield until, until
+                if until >= self.duration:
+                    return
+                k += 1
+
+    def _start(self):
+        if not self.parallel:
+            return [_InlineShard(self.shard_params, seed) for seed in self.shard_seeds], []
+
+        connections, processes = [], []
+        for seed in self.shard_seeds:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve, args=(child, self.shard_params, seed), name='simulation-shard', daemon=True,
+            )
+            process.start()
+            child.close()
+            connections.append(parent)
+            processes.append(process)
+        return connections, processes
+
+    def run(self):
+        shards, processes = self._start()
+        loads = [0] * self.num_shards
+        in_flight = 0
+        try:
+            for until, shard_until in self._epochs():
+                times, sources, priorities = self.flow.take(until)
+                when = np.ceil(times / self.delta - 1e-9).astype(np.int64) if self.engine == 'tick' else times
+
+                limit = 0 if self.router.dynamic else LOOKAHEAD
+                while in_flight > limit:
+                    replies = [shard.recv() for shard in shards]
+                    loads = [queued + busy for queued, busy in replies]
+                    in_flight -= 1
+
+                routes = self.router.route(sources, priorities, loads)
+                for index, shard in enumerate(shards):
+                    mask = routes == index
+                    shard.send((shard_until, when[mask], sources[mask], priorities[mask]))
+                in_flight += 1
+
+            for _ in range(in_flight):
+                for shard in shards:
+                    shard.recv()
+            for shard in shards:
+                shard.send(None)
+            self.results = [shard.recv() for shard in shards]
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        return self.summary()
+
+    def summary(self):
+        """``Simulation.summary()`` of the whole platform plus a ``shards`` table."""
+        results = self.results
+        num_sources = self.flow.num_sources
+        clock = results[0]['clock'] if results else 0.0
+
+        stats = ReportStats()
+        source_stats = [ReportStats() for _ in range(num_sources)]
+        source_counts = [[0, 0] for _ in range(num_sources)]
+        devices = []
+        shards = []
+
+        for index, result in enumerate(results):
+            stats.merge(result['stats'])
+            for i, (generated, rejected, s) in enumerate(result['sources']):
+                source_counts[i][0] += generated
+                source_counts[i][1] += rejected
+                source_stats[i].merge(s)
+            for busy_time, processed in result['devices']:
+                utilization = busy_time / clock * 100 if clock > 0 else 0.0
+                devices.append({
+                    'device': f"D{len(devices) + 1}",
+                    'total_busy_time': busy_time,
+                    'processed_count': processed,
+                    'utilization_percent': min(utilization, 100),
+                })
+            shards.append({
+                'shard': f"B{index + 1}",
+                'generated': result['generated'],
+                'completed': result['completed'],
+                'rejected': result['rejected'],
+                'rejection_percent': _percent(result['rejected'], result['generated']),
+                'avg_waiting_time': result['stats'].wait.mean,
+            })
+
+        generated = sum(r['generated'] for r in results)
+        rejected = sum(r['rejected'] for r in results)
+        return {
+            'generated': generated,
+            'started': sum(r['started'] for r in results),
+            'completed': sum(r['completed'] for r in results),
+            'rejected': rejected,
+            'rejection_percent': _percent(rejected, generated),
+            **stats.as_dict(),
+            'sources': [
+                {
+                    'source': f"S{i + 1}",
+                    'generated': generated,
+                    'rejected': rejected,
+                    'completed': s.count,
+                    'rejection_percent': _percent(rejected, generated),
+                    'avg_waiting_time': s.wait.mean,
+                    'avg_service_time': s.service.mean,
+                }
+                for i, ((generated, rejected), s) in enumerate(zip(source_counts, source_stats))
+            ],
+            'devices': devices,
+            'shards': shards,
+        }
+
+
+def _percent(part, whole):
+    return part / whole * 100 if whole else 0.0
@@ -0,0 +1,355 @@
+"""Standalone simulation runner.
+
+``python -m app.sim`` accepts the same options as ``manage.py run_simulation``
+but never bootstraps Django, and pandas is only imported when result tables
+are printed, so short runs start in a fraction of the time.
+"""
+import argparse
+import cProfile
+import os
+import sys
+from contextlib import nullcontext
+from math import inf
+
+from .arguments import UsageError, add_run_arguments, fork_changes, simulation_params
+from .profiling import PhaseProfiler
+from .simulation import Simulation
+from .timeseries import TimeSeries
+from .trace import TraceWriter
+
+# Wall-clock budget of a sequential run that has no --duration cap, in seconds.
+SEQUENTIAL_WALL_TIME = 60.0
+
+# Step-mode rows written to the output at once.
+STEP_FLUSH_ROWS = 4096
+
+
+def run(opts):
+    """Run a simulation as configured by parsed ``add_run_arguments`` options."""
+    if not opts['input']:
+        return _run(opts)
+
+    from .inputs import InputError
+
+    # A malformed row may only be reached in the middle of the run.
+    try:
+        return _run(opts)
+    except InputError as exc:
+        raise UsageError(f"{opts['input']}: {exc}") from None
+
+
+def _run(opts):
+    mode = opts['mode']
+    params = simulation_params(opts)
+    if opts['input']:
+        if (mode == "analytic" or opts['shards'] > 1 or opts['ensemble'] or opts['checkpoint']
+                or opts['resume']):
+            raise UsageError("--input cannot be combined with analytic mode, --shards, --ensemble, "
+                             "--checkpoint or --resume")
+        params.update(input_params(opts))
+    elif opts['time_scale'] != 1.0 or opts['input_columns']:
+        raise UsageError("--time-scale and --input-columns require --input")
+
+    if mode == "analytic":
+        if opts['replications'] > 1 or opts['persist'] or opts['checkpoint'] or opts['resume'] or opts['trace']:
+            raise UsageError("analytic mode does not simulate: --replications, --persist, --checkpoint, "
+                             "--resume and --trace are not supported")
+        run_analytic_mode(params)
+        return
+
+    if mode == "sequential":
+        if opts['replications'] > 1:
+            raise UsageError("--replications is not supported in sequential mode")
+        if opts['checkpoint_at'] is not None:
+            raise UsageError("--checkpoint-at is not supported in sequential mode")
+        if params['lambda_rate'] <= 0 and not opts['input']:
+            raise UsageError("sequential mode needs --lambda above 0")
+        if opts['duration'] is None and not opts['input']:
+            params['duration'] = inf
+
+    if opts['shards'] > 1:
+        if mode != "auto":
+            raise UsageError("--shards is only supported in auto mode")
+        if (opts['replications'] > 1 or opts['persist'] or opts['checkpoint'] or opts['resume']
+                or opts['trace'] or opts['series_out'] or opts['profile'] or opts['profile_dump']):
+            raise UsageError("--shards cannot be combined with --replications, --persist, --checkpoint, "
+                             "--resume, --trace, --series-out or --profile")
+        run_sharded_mode(params, opts['shards'], opts['router'], opts['epoch'], opts['seed'])
+        return
+
+    if opts['replications'] > 1:
+        if mode == "step":
+            raise UsageError("--replications is only supported in auto mode")
+        if opts['persist'] or opts['checkpoint'] or opts['resume']:
+            raise UsageError("--persist, --checkpoint and --resume are only supported for single runs")
+        if opts['ensemble'] and params['engine'] != 'tick':
+            raise UsageError("--ensemble requires the tick engine")
+        run_replications_mode(params, opts['replications'], opts['workers'], opts['seed'], opts['ensemble'])
+        return
+
+    if opts['every'] < 1:
+        raise UsageError("--every must be at least 1")
+    if opts['step_output'] and mode != "step":
+        raise UsageError("--step-output is only supported in step mode")
+
+    if opts['checkpoint_at'] is not None and not opts['checkpoint']:
+        raise UsageError("--checkpoint-at requires --checkpoint")
+    if opts['fork'] and not opts['resume']:
+        raise UsageError("--fork requires --resume")
+    if opts['resume'] and opts['persist']:
+        raise UsageError("--persist cannot be combined with --resume")
+
+    trace = TraceWriter(opts['trace']) if opts['trace'] else None
+    profiler = PhaseProfiler() if opts['profile'] or opts['profile_dump'] else None
+    if opts['resume']:
+        from .checkpoint import CheckpointError, load
+
+        try:
+            sim = load(opts['resume'], trace=trace, profiler=profiler, **fork_changes(opts['fork']))
+        except (OSError, CheckpointError) as exc:
+            raise UsageError(str(exc)) from None
+    else:
+        sim = Simulation(**params, seed=opts['seed'], trace=trace, profiler=profiler,
+                         retain_reports=opts['persist'])
+    until = opts['checkpoint_at']
+
+    def rendering():
+        """Time console output as the ``render`` phase when profiling."""
+        return profiler.phase('render') if profiler is not None else nullcontext()
+
+    profile = cProfile.Profile() if opts['profile_dump'] else None
+    if profile is not None:
+        profile.enable()
+
+    if mode == "step":
+        with open(opts['step_output'], 'w', encoding='utf-8') if opts['step_output'] else nullcontext() as output:
+            run_step_mode(
+                sim, rendering, until,
+                output=output,
+                every=opts['every'],
+                only_events=opts['only_events'],
+                diff=opts['diff'],
+                max_items=opts['max_items'] or None,
+            )
+    elif mode == "sequential":
+        run_sequential_mode(sim, opts, rendering)
+    else:
+        series = None
+        if opts['series_out']:
+            series = TimeSeries(
+                every=opts['series_every'],
+                decimate=opts['series_decimate'],
+                max_points=opts['series_max_points'],
+            )
+        run_auto_mode(sim, series, rendering, until)
+        if series is not None:
+            series.save(opts['series_out'])
+
+    if profile is not None:
+        profile.disable()
+        profile.dump_stats(opts['profile_dump'])
+
+    if trace is not None:
+        trace.close(end_time=sim.clock)
+
+    if opts['checkpoint']:
+        from .checkpoint import save
+
+        save(sim, opts['checkpoint'])
+        print(f"\nCheckpoint at t={sim.clock:.2f} written to {opts['checkpoint']}")
+
+    if opts['persist']:
+        if opts['input']:
+            # The log's sources and mean rate take the place of the generator settings.
+            params = {**params, 'arrivals': 'file', 'num_sources': len(sim.sources),
+                      'lambda_rate': sim.generated / sim.clock if sim.clock > 0 else 0.0}
+        persist(sim, params, opts['seed'])
+
+    if profiler is not None:
+        from .reporting import print_profile
+
+        print_profile(sim.summary()['profile'])
+        if profile is not None:
+            print(f"\ncProfile statistics written to {opts['profile_dump']}")
+
+
+def input_params(opts):
+    """``Simulation`` keyword arguments replaying the ``--input`` log."""
+    from .inputs import COLUMNS, FileArrivals
+
+    try:
+        arrivals = FileArrivals(opts['input'], opts['time_scale'], opts['input_columns'] or COLUMNS)
+        params = {'arrivals': arrivals}
+        if opts['duration'] is None:
+            params['duration'] = arrivals.end_time()
+    except (OSError, ImportError, ValueError) as exc:
+        raise UsageError(f"Cannot read {opts['input']}: {exc}") from None
+    return params
+
+
+def run_step_mode(sim: Simulation, rendering=nullcontext, until=None, output=None, every=1, only_events=False,
+                  diff=False, max_items=None):
+    """Print one table row per step, or per ``every`` steps.
+
+    Rows are collected and written to ``output`` (stdout by default)
+    ``STEP_FLUSH_ROWS`` at a time. With ``only_events`` steps without events
+    are skipped. With ``diff`` the buffer and operators columns are left
+    blank while they are unchanged since the last printed row, and rows where
+    nothing happened are skipped. ``max_items`` truncates both columns.
+    """
+    end = sim.duration if until is None else min(until, sim.duration)
+    output = sys.stdout if output is None else output
+    rows = [
+        f"{'t':>6} | Events{' ' * 54} | Buffer{' ' * 31} | Operators{' ' * 31} | %rej",
+        "-" * 140,
+    ]
+    dispatcher = sim.dispatcher
+    buffer_key = devices_key = None
+    buffer_state = devices_state = ""
+    step = 0
+
+    while sim.clock < end:
+        events = sim.step()
+        step += 1
+        if step % every or (only_events and not events):
+            continue
+
+        with rendering():
+            # The buffer can only change on arrivals and starts, the devices
+            # on starts and releases, so the state strings are rebuilt only
+            # when those counters move.
+            buffer_changed = devices_changed = False
+            key = (sim.generated, sim.started)
+            if key != buffer_key:
+                buffer_key = key
+                state = sim.buffer_state(max_items)
+                buffer_changed = state != buffer_state
+                buffer_state = state
+            key = (sim.started, dispatcher.busy_count)
+            if key != devices_key:
+                devices_key = key
+                state = sim.devices_state(max_items)
+                devices_changed = state != devices_state
+                devices_state = state
+
+            if diff:
+                if not (events or buffer_changed or devices_changed):
+                    continue
+                buffer = buffer_state if buffer_changed else ""
+                devices = devices_state if devices_changed else ""
+            else:
+                buffer, devices = buffer_state, devices_state
+
+            rows.append(
+                f"{sim.clock:6.2f} | "
+                f"{'; '.join(events):60} | "
+                f"{buffer:37} | "
+                f"{devices:40} | "
+                f"{sim.rejection_percent():5.2f}"
+            )
+            if len(rows) >= STEP_FLUSH_ROWS:
+                output.write("\n".join(rows) + "\n")
+                rows.clear()
+
+    output.write("\n".join(rows) + "\n" if rows else "")
+    output.flush()
+
+
+def run_auto_mode(sim: Simulation, series: TimeSeries = None, rendering=nullcontext, until=None):
+    end = sim.duration if until is None else min(until, sim.duration)
+    if series is None:
+        while sim.clock < end:
+            sim.step()
+    else:
+        while sim.clock < end:
+            events = sim.step()
+            series.append(sim.clock, len(sim.buffer), sim.busy_devices(), len(events), sim.rejection_percent())
+        series.finish()
+
+    with rendering():
+        from .reporting import print_summary
+
+        print_summary(sim.duration, sim.summary(), sim.average_waiting_time(), sim.average_service_time())
+
+
+def run_sequential_mode(sim: Simulation, opts, rendering=nullcontext):
+    from .stopping import run_sequential
+
+    max_wall_time = opts['max_wall_time']
+    if max_wall_time is None and opts['duration'] is None:
+        max_wall_time = SEQUENTIAL_WALL_TIME
+
+    result = run_sequential(
+        sim,
+        precision=opts['precision'],
+        metrics=opts['metrics'],
+        window=opts['window'],
+        batches=opts['batches'],
+        max_wall_time=max_wall_time,
+    )
+
+    with rendering():
+        from .reporting import print_sequential
+
+        print_sequential(result)
+
+
+def run_analytic_mode(params):
+    from .analytic import estimate
+    from .reporting import print_analytic
+
+    print_analytic(params, estimate(**params))
+
+
+def run_sharded_mode(params, shards, router, epoch, seed):
+    from .reporting import print_shards, print_summary
+    from .sharding import ShardedSimulation
+
+    try:
+        summary = ShardedSimulation(shards, **params, router=router, epoch=epoch, seed=seed).run()
+    except ValueError as exc:
+        raise UsageError(str(exc)) from None
+    print_summary(params['duration'], summary, summary['waiting_time']['mean'], summary['service_time']['mean'])
+    print_shards(summary['shards'])
+
+
+def run_replications_mode(params, replications, workers, seed, ensemble=False):
+    from .replications import aggregate, run_ensemble, run_replications
+    from .reporting import print_replications
+
+    if ensemble:
+        summaries = run_ensemble(params, replications, seed)
+    else:
+        summaries = run_replications(params, replications, workers, seed)
+    print_replications(params['duration'], aggregate(summaries))
+
+
+def persist(sim, params, seed):
+    """Save the run to the database, bootstrapping Django if ``app.sim`` skipped it."""
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+        django.setup()
+
+    from .persistence import save_run
+
+    run = save_run(sim, params, seed)
+    print(f"\nSaved as simulation run #{run.pk}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.sim', description="Run the bug-bounty platform simulation.")
+    add_run_arguments(parser)
+    opts = vars(parser.parse_args(argv))
+
+    try:
+        run(opts)
+    except UsageError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == '__main__':
+    main()
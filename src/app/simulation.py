@@ -1,27 +1,65 @@
-from random import uniform
+from math import inf, nan
 
-from .models import Buffer, Device, Report, Source
+from .buffer import IndexedBuffer
+from .dispatcher import Dispatcher
+from .distributions import ARRIVAL_PROCESSES, SERVICE_DISTRIBUTIONS, Draws
+from .random_streams import RandomStreams
+from .records import Device, Report, Source
+from .statistics import ReportStats
+from .trace import ACCEPTED, EVICTED, REJECTED, STARTED
 
 
-class Simulation:
-    def __init__(self, lambda_rate, duration, delta, buffer_size, num_devices, num_sources):
-        self.lambda_rate = lambda_rate
-        self.duration = duration
-        self.delta = delta
+ENGINES = ('tick', 'event')
 
-        self.sources = [Source(name=f"S{i + 1}") for i in range(num_sources)]
+# Bump whenever a change alters the results produced for a given seed, so
+# cached results of older versions are not reused.
+ENGINE_VERSION = 3
 
-        for source in self.sources:
-            source.generated_count = 0
-            source.rejected_count = 0
-            source.completed_reports = []
+# Fraction of a tick by which a replayed arrival may trail the accumulated
+# tick clock and still be due on that tick.
+REPLAY_TOLERANCE = 1e-9
 
-        self.buffer = Buffer(size=buffer_size)
-        self.devices = [Device(name=f"D{i + 1}") for i in range(num_devices)]
 
-        for device in self.devices:
-            device.total_busy_time = 0.0
-            device.processed_count = 0
+class Simulation:
+    """One run of the platform model.
+
+    With ``crn`` (common random numbers) every report draws its service time
+    on arrival and a batch is served for the time drawn by its head report.
+    The n-th report then has the same source, priority and service time in
+    every configuration run with the same seed, whatever the buffer and
+    device pool do with it, which keeps paired comparisons synchronized.
+    ``sampling`` selects how variates are drawn (see ``random_streams``).
+
+    With replayed arrivals (``inputs.FileArrivals``) the instants, submitters
+    and priorities come from the log instead; ``num_sources`` is ignored and
+    a ``Source`` is added for every researcher when they first submit.
+    """
+
+    def __init__(self, lambda_rate, duration, delta, buffer_size, num_devices, num_sources, engine='tick',
+                 retain_reports=False, seed=None, arrivals='uniform', service='uniform', trace=None,
+                 profiler=None, crn=False, sampling='native'):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if isinstance(arrivals, str):
+            arrivals = ARRIVAL_PROCESSES[arrivals](lambda_rate)
+        if isinstance(service, str):
+            service = SERVICE_DISTRIBUTIONS[service]()
+
+        self.lambda_rate = lambda_rate
+        self.duration = duration
+        self.delta = delta
+        self.engine = engine
+        self.retain_reports = retain_reports
+        self.arrivals = arrivals
+        self.service = service
+        self.crn = crn
+        self.random = RandomStreams(seed, sampling)
+
+        self.sources = [] if arrivals.replay else [Source(i, f"S{i + 1}") for i in range(num_sources)]
+        self._source_keys = {}
+        self.buffer = IndexedBuffer(size=buffer_size)
+        self.devices = [Device(i, f"D{i + 1}") for i in range(num_devices)]
+        self.dispatcher = Dispatcher(self.devices)
 
         self.clock = 0.0
         self.generated = 0
@@ -29,141 +67,254 @@ class Simulation:
         self.completed = 0
         self.started = 0
         self.completed_reports = []
+        self.stats = ReportStats()
         self._report_accumulator = 0.0
-        self.current_device_index = 0
-
-    def generate_reports(self):
-        events = []
-        self._report_accumulator += self.lambda_rate * self.delta
-        n_new = int(self._report_accumulator)
-        self._report_accumulator -= n_new
-
-        for _ in range(n_new):
-            source = self.sources[int(uniform(0, len(self.sources)))]
 
-            report = Report(
-                source=source,
-                priority=int(uniform(1, 5)),
-            )
-            report.submitted_time = self.clock
-
-            source.generated_count += 1
-
-            self.generated += 1
-            successful, replaced = self.buffer.enqueue(report)
+        self._source_draws = Draws(self.random.sources, lambda g, n: g.integers(0, num_sources, n))
+        self._priority_draws = Draws(self.random.priorities, lambda g, n: g.integers(1, 5, n))
+        self._service_draws = Draws(self.random.service, service.sample)
+        if arrivals.random:
+            self._arrival_counts = Draws(self.random.arrivals, lambda g, n: arrivals.counts(g, n, delta))
+            self._arrival_intervals = Draws(self.random.arrivals, arrivals.intervals)
+        if arrivals.replay:
+            self._replay = arrivals.stream()
+            self._replay_source = self._replay_priority = None
+
+        # Next arrival instant, used by the next-event engine. The evenly
+        # spaced flow counts arrivals from ``_arrival_origin``, which only
+        # moves when a forked run changes ``lambda_rate``.
+        self._next_arrival = 0.0
+        self._arrival_origin = 0.0
+        self._arrival_base = 0
+        self._schedule_arrival()
+
+        self.trace = trace
+        if trace is not None:
+            trace.attach(self)
+
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instrument(self)
+
+    @property
+    def current_device_index(self):
+        return self.dispatcher.position
+
+    @current_device_index.setter
+    def current_device_index(self, value):
+        self.dispatcher.position = value
+
+    def _schedule_arrival(self):
+        if self.arrivals.replay:
+            record = next(self._replay, None)
+            if record is None:
+                self._next_arrival = inf
+            else:
+                self._next_arrival, self._replay_source, self._replay_priority = record
+        elif self.arrivals.random:
+            self._next_arrival += self._arrival_intervals.next()
+        elif self.lambda_rate > 0:
+            self._next_arrival = self._arrival_origin + (self.generated - self._arrival_base + 1) / self.lambda_rate
+        else:
+            self._next_arrival = inf
 
-            if successful:
+    def generate_reports(self):
+        if self.arrivals.replay:
+            # Rows are due on the first tick at or after their instant.
+            events = []
+            due = self.clock + REPLAY_TOLERANCE * self.delta
+            while self._next_arrival <= due:
+                events.append(self.generate_report())
+                self._schedule_arrival()
+            return events
+
+        if self.arrivals.random:
+            n_new = self._arrival_counts.next()
+        else:
+            self._report_accumulator += self.lambda_rate * self.delta
+            n_new = int(self._report_accumulator)
+            self._report_accumulator -= n_new
+
+        return [self.generate_report() for _ in range(n_new)]
+
+    def generate_report(self):
+        if self.arrivals.replay:
+            return self.admit(self.source_for(self._replay_source), self._replay_priority)
+        return self.admit(self.sources[self._source_draws.next()], self._priority_draws.next())
+
+    def source_for(self, key):
+        """The ``Source`` of a replayed researcher, added on their first report."""
+        source = self._source_keys.get(key)
+        if source is None:
+            source = self._source_keys[key] = Source(len(self.sources), str(key))
+            self.sources.append(source)
+        return source
+
+    def admit(self, source, priority):
+        """Offer a new report of ``source`` to the buffer at the current clock.
+
+        Returns the step event: accepted, accepted by evicting a lower
+        priority report (Д1ОО2), or rejected.
+        """
+        report = Report(self.generated, source, priority, self.clock)
+        if self.crn:
+            report.service_time = self._service_draws.next()
+
+        source.generated_count += 1
+
+        self.generated += 1
+        successful, replaced = self.buffer.enqueue(report)
+        trace = self.trace
+
+        if successful:
+            if trace is not None:
                 if replaced:
-                    replaced.source.rejected_count += 1
-                    self.rejected += 1
-                    events.append(f"replace#{self.buffer.queue.index(report)}")
-                else:
-                    events.append(f"gen#{self.generated - 1}")
-            else:
+                    trace.record(self.clock, EVICTED, replaced, -1, nan, len(self.buffer) - 1)
+                trace.record(self.clock, ACCEPTED, report, -1, nan, len(self.buffer))
+
+            if replaced:
+                replaced.source.rejected_count += 1
                 self.rejected += 1
-                source.rejected_count += 1
-                events.append(f"rej#{self.generated - 1}")
+                return f"replace#{len(self.buffer) - 1}"
+            return f"gen#{self.generated - 1}"
 
-        return events
+        if trace is not None:
+            trace.record(self.clock, REJECTED, report, -1, nan, len(self.buffer))
+
+        self.rejected += 1
+        source.rejected_count += 1
+        return f"rej#{self.generated - 1}"
 
     def process_devices(self):
+        """Start every free device that has work, in Д2П2 ring order."""
         events = []
+        dispatcher = self.dispatcher
+        buffer = self.buffer
+        trace = self.trace
 
-        if not hasattr(self, 'current_device_index'):
-            self.current_device_index = 0
+        dispatcher.release(self.clock)
 
-        checked_devices = 0
-        devices_count = len(self.devices)
+        while dispatcher.has_free() and not buffer.is_empty():
+            device = dispatcher.acquire()
+            tasks = buffer.pull_tasks(device, batch_by_source=True)
 
-        while checked_devices < devices_count:
-            device = self.devices[self.current_device_index]
+            service_time = tasks[0].service_time if self.crn else self._service_draws.next()
+            device.busy_until = self.clock + service_time
+            self.started += len(tasks)
 
-            self.current_device_index = (self.current_device_index + 1) % devices_count
-            checked_devices += 1
+            device.add_busy_time(service_time)
+            dispatcher.occupy(device)
 
-            if device.is_free(self.clock):
-                tasks = self.buffer.pull_tasks(device, batch_by_source=True)
-                if tasks:
-                    service_time = uniform(5, 10)
-                    device.busy_until = self.clock + service_time
-                    self.started += len(tasks)
+            for task in tasks:
+                task.status = "done"
+                task.start_time = self.clock
+                task.end_time = self.clock + service_time
+                self.completed += 1
 
-                    device.add_busy_time(service_time)
+                wait = self.clock - task.submitted_time
+                self.stats.add(wait, service_time)
+                task.source.stats.add(wait, service_time)
 
-                    for task in tasks:
-                        task.status = "done"
-                        task.start_time = self.clock
-                        task.end_time = self.clock + service_time
-                        self.completed += 1
-                        self.completed_reports.append(task)
-                        task.source.completed_reports.append(task)
+                if self.retain_reports:
+                    self.completed_reports.append(task)
+                    task.source.completed_reports.append(task)
 
-                    events.append(f"start#{device.name}")
-                    break
+                if trace is not None:
+                    trace.record(self.clock, STARTED, task, device.index, device.busy_until, len(buffer))
+
+            events.append(f"start#{device.name}")
 
         return events
 
     def step(self):
+        if self.engine == 'event':
+            return self._step_event()
+        return self._step_tick()
+
+    def run(self):
+        while self.clock < self.duration:
+            self.step()
+        return self.summary()
+
+    def _step_tick(self):
         self.clock += self.delta
         events = []
         events += self.generate_reports()
         events += self.process_devices()
         return events
 
-    def buffer_state(self):
-        return f"{len(self.buffer.queue)}: {[r.priority for r in self.buffer.queue]}"
+    def _step_event(self):
+        """Jump the clock to the next arrival or device completion.
+
+        Every event scheduled for the same instant is handled in one step, so
+        nothing waits for an artificial tick boundary.
+        """
+        next_time = min(self._next_arrival, self.dispatcher.next_completion())
+
+        if next_time > self.duration:
+            self.clock = self.duration
+            self.dispatcher.release(self.clock)
+            return []
+        if next_time == inf:
+            # Nothing is scheduled and there is no horizon: the clock stays put.
+            return []
+
+        self.clock = next_time
+        events = []
 
-    def devices_state(self):
-        return "; ".join(
+        while self._next_arrival <= self.clock:
+            events.append(self.generate_report())
+            self._schedule_arrival()
+
+        events += self.process_devices()
+        return events
+
+    def buffer_state(self, limit=None):
+        """``"n: [priorities]"`` in FIFO order; past ``limit`` reports the rest is counted."""
+        n = len(self.buffer)
+        if limit is None or n <= limit:
+            return f"{n}: {[r.priority for r in self.buffer.queue]}"
+        head = ', '.join(str(r.priority) for r in self.buffer.head(limit))
+        return f"{n}: [{head}, …+{n - limit}]"
+
+    def devices_state(self, limit=None):
+        """Every device's state; past ``limit`` devices only the busy count is added."""
+        devices = self.devices if limit is None else self.devices[:limit]
+        state = "; ".join(
             f"{d.name}:{'free' if d.is_free(self.clock) else f'busy→{d.busy_until:.1f}'}"
-            for d in self.devices
+            for d in devices
         )
+        if len(devices) < len(self.devices):
+            state += f"; …+{len(self.devices) - len(devices)} ({self.dispatcher.busy_count} busy)"
+        return state
+
+    def busy_devices(self):
+        return self.dispatcher.busy_count
 
     def rejection_percent(self):
         return (self.rejected / self.generated * 100) if self.generated else 0
 
     def average_waiting_time(self):
-        if not self.completed_reports:
-            return 0.0
-        total_wait = sum(r.start_time - r.submitted_time for r in self.completed_reports)
-        return total_wait / len(self.completed_reports)
+        return self.stats.wait.mean
 
     def average_service_time(self):
-        if not self.completed_reports:
-            return 0.0
-        total_service = sum(r.end_time - r.start_time for r in self.completed_reports)
-        return total_service / len(self.completed_reports)
+        return self.stats.service.mean
 
     def source_statistics(self):
         stats = []
         for source in self.sources:
             generated = source.generated_count
             rejected = source.rejected_count
-            completed = len(source.completed_reports)
             rejection_pct = (rejected / generated * 100) if generated > 0 else 0.0
 
-            if source.completed_reports:
-                avg_wait = sum(
-                    r.start_time - r.submitted_time for r in source.completed_reports
-                ) / len(source.completed_reports)
-            else:
-                avg_wait = 0.0
-
-            if source.completed_reports:
-                avg_service = sum(
-                    r.end_time - r.start_time for r in source.completed_reports
-                ) / len(source.completed_reports)
-            else:
-                avg_service = 0.0
-
             stats.append({
                 'source': source.name,
                 'generated': generated,
                 'rejected': rejected,
-                'completed': completed,
+                'completed': source.stats.count,
                 'rejection_percent': rejection_pct,
-                'avg_waiting_time': avg_wait,
-                'avg_service_time': avg_service,
+                'avg_waiting_time': source.stats.wait.mean,
+                'avg_service_time': source.stats.service.mean,
             })
         return stats
 
@@ -183,12 +334,16 @@ class Simulation:
         return stats
 
     def summary(self):
-        return {
+        summary = {
             "generated": self.generated,
             "started": self.started,
             "completed": self.completed,
             "rejected": self.rejected,
             "rejection_percent": self.rejection_percent(),
+            **self.stats.as_dict(),
             "sources": self.source_statistics(),
             "devices": self.device_statistics(),
         }
+        if self.profiler is not None:
+            summary["profile"] = self.profiler.as_dict()
+        return summary
@@ -0,0 +1,218 @@
+"""Sequential stopping: run until the estimates reach a target precision.
+
+The run is observed in consecutive windows of ``window`` model time units.
+Each window contributes a numerator and a denominator per metric (e.g. waiting
+time summed over the reports started in it and their count), so estimates
+are ratio estimators and windows of unequal size are weighted correctly.
+
+After every window the warm-up is located with MSER (the truncation point
+that minimizes the standard error of the remaining window means, searched in
+the first half of the run) on the queue-length series and on every chosen
+metric. The windows after it are grouped into ``batches`` contiguous batches
+whose means give a t confidence interval. The run stops as soon as the
+relative half-width of every chosen metric is below ``precision``, when the
+wall-time budget or the model-time horizon runs out, or when the event engine
+has no arrival or completion left to jump to.
+"""
+import math
+import time
+
+import numpy as np
+
+from .statistics import t_quantile
+
+METRICS = ('rejection_percent', 'avg_waiting_time', 'avg_sojourn_time', 'queue_length')
+
+DEFAULT_METRICS = ('rejection_percent', 'avg_waiting_time')
+
+# Windows per batch mean before a stopping decision is trusted: below this
+# the batch means are too short to be treated as independent.
+MIN_WINDOWS_PER_BATCH = 2
+
+# The rule is re-evaluated once the number of windows has grown by this
+# fraction, which bounds the overshoot and keeps the checks' total cost linear.
+CHECK_GROWTH = 0.02
+
+
+def mser(values):
+    """MSER truncation point of ``values``: how many leading ones to drop."""
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    if n < 4:
+        return 0
+
+    # Sums over x[d:] for every candidate d in the first half.
+    tail = np.cumsum(x[::-1])[::-1]
+    tail_sq = np.cumsum((x * x)[::-1])[::-1]
+    d = np.arange(n // 2 + 1)
+    m = n - d
+    mean = tail[d] / m
+    statistic = (tail_sq[d] - m * mean * mean) / (m * m)
+    return int(np.argmin(statistic))
+
+
+def batch_means(numerators, denominators, batches, level=0.95):
+    """Ratio estimate and t half-width from ``batches`` contiguous batch means.
+
+    Leading windows that do not fill a whole batch are dropped.
+    """
+    n = len(numerators)
+    size = n // batches
+    start = n - size * batches
+    num = np.asarray(numerators[start:]).reshape(batches, size).sum(axis=1)
+    den = np.asarray(denominators[start:]).reshape(batches, size).sum(axis=1)
+
+    total = den.sum()
+    estimate = num.sum() / total if total else 0.0
+    means = np.divide(num, den, out=np.zeros(batches), where=den > 0)
+    if batches < 2:
+        return estimate, math.inf
+    half_width = t_quantile((1 + level) / 2, batches - 1) * means.std(ddof=1) / math.sqrt(batches)
+    return float(estimate), float(half_width)
+
+
+class WindowObserver:
+    """Per-window numerators and denominators of every metric in ``METRICS``."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.numerators = {name: [] for name in METRICS}
+        self.denominators = {name: [] for name in METRICS}
+        self.idle = False
+        self._last = self._totals()
+
+    def __len__(self):
+        return len(self.numerators['queue_length'])
+
+    def _totals(self):
+        sim = self.sim
+        return (sim.generated, sim.rejected, sim.stats.count, sim.stats.wait.total, sim.stats.sojourn.total)
+
+    def advance(self, until):
+        """Step the simulation to ``until`` and record the window ending there.
+
+        The buffer occupancy after a step holds until the next one, so the
+        queue length is integrated as a step function of model time.
+        """
+        sim = self.sim
+        start = sim.clock
+        queue_area = 0.0
+        while sim.clock < until:
+            queued = len(sim.buffer)
+            clock = sim.clock
+            sim.step()
+            if sim.clock == clock:
+                # The event engine with nothing left to happen.
+                self.idle = True
+                break
+            queue_area += queued * (sim.clock - clock)
+
+        totals = self._totals()
+        generated, rejected, completed, wait, sojourn = (a - b for a, b in zip(totals, self._last))
+        self._last = totals
+
+        self._append('rejection_percent', 100 * rejected, generated)
+        self._append('avg_waiting_time', wait, completed)
+        self._append('avg_sojourn_time', sojourn, completed)
+        self._append('queue_length', queue_area, sim.clock - start)
+
+    def _append(self, name, numerator, denominator):
+        self.numerators[name].append(numerator)
+        self.denominators[name].append(denominator)
+
+    def warmup(self, name):
+        """MSER truncation point of the window means of ``name``, in windows.
+
+        Windows without observations (e.g. no report started) are skipped.
+        """
+        num = np.asarray(self.numerators[name], dtype=float)
+        den = np.asarray(self.denominators[name], dtype=float)
+        valid = np.flatnonzero(den > 0)
+        if not len(valid):
+            return 0
+        return int(valid[mser(num[valid] / den[valid])])
+
+
+def run_sequential(sim, precision=0.05, metrics=DEFAULT_METRICS, window=None, batches=20,
+                   max_wall_time=None, level=0.95, progress=None):
+    """Run ``sim`` until every metric in ``metrics`` reaches ``precision``.
+
+    ``precision`` is the target relative half-width of the ``level``
+    confidence interval. ``window`` defaults to 100 ticks. The run also stops
+    at ``sim.duration`` or after ``max_wall_time`` seconds. ``progress`` is
+    called with the interim result at every check of the rule.
+
+    Returns a dict with the stop ``reason`` (``'precision'``, ``'wall_time'``,
+    ``'duration'`` or ``'idle'`` when nothing is left to happen), the warm-up length, the estimate, half-width and
+    relative half-width of every chosen metric, and ``sim.summary()`` of the
+    whole run including the warm-up.
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics {', '.join(sorted(unknown))}, expected some of {METRICS}")
+
+    window = window or 100 * sim.delta
+    observer = WindowObserver(sim)
+    started = time.perf_counter()
+    detection = ('queue_length',) + tuple(m for m in metrics if m != 'queue_length')
+    result = None
+    next_check = 1
+
+    while True:
+        observer.advance(min(sim.clock + window, sim.duration))
+
+        n = len(observer)
+        elapsed = time.perf_counter() - started
+        out_of_time = observer.idle or sim.clock >= sim.duration or (max_wall_time is not None and elapsed >= max_wall_time)
+        if n < next_check and not out_of_time:
+            continue
+        next_check = max(n + 1, math.ceil(n * (1 + CHECK_GROWTH)))
+
+        warmup = max(observer.warmup(name) for name in detection)
+        retained = n - warmup
+        k = min(batches, retained)
+
+        estimates = {}
+        for name in metrics:
+            estimate, half_width = batch_means(
+                observer.numerators[name][warmup:], observer.denominators[name][warmup:], max(k, 1), level,
+            )
+            relative = half_width / abs(estimate) if estimate else (0.0 if half_width == 0 else math.inf)
+            estimates[name] = {'estimate': estimate, 'half_width': half_width, 'relative': relative}
+
+        converged = (
+            retained >= batches * MIN_WINDOWS_PER_BATCH
+            and warmup < n // 2
+            and all(e['relative'] <= precision for e in estimates.values())
+        )
+
+        if converged:
+            reason = 'precision'
+        elif sim.clock >= sim.duration:
+            reason = 'duration'
+        elif observer.idle:
+            reason = 'idle'
+        elif max_wall_time is not None and elapsed >= max_wall_time:
+            reason = 'wall_time'
+        else:
+            reason = None
+
+        result = {
+            'reason': reason,
+            'clock': sim.clock,
+            'wall_time': elapsed,
+            'warmup': warmup * window,
+            'windows': n,
+            'window': window,
+            'batches': k,
+            'precision': precision,
+            'level': level,
+            'metrics': estimates,
+        }
+        if progress:
+            progress(result)
+        if reason is not None:
+            break
+
+    result['summary'] = sim.summary()
+    return result
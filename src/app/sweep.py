@@ -0,0 +1,243 @@
+"""Parameter sweeps: run a grid of configurations across a process pool."""
+import itertools
+import math
+import operator
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from .analytic import estimate
+from .replications import run_replications
+from .simulation import Simulation
+from .statistics import confidence_interval
+from .stopping import run_sequential
+
+# Grid axis name on the command line -> (Simulation keyword, value type).
+GRID_PARAMETERS = {
+    'lambda': ('lambda_rate', float),
+    'buffer-size': ('buffer_size', int),
+    'operators': ('num_devices', int),
+    'sources': ('num_sources', int),
+    'duration': ('duration', float),
+    'delta': ('delta', float),
+}
+
+
+def parse_axis(spec, max_values=None):
+    """Parse ``name=v1,v2,...`` or ``name=start:stop[:step]`` (stop inclusive).
+
+    With ``max_values``, axes with more values are rejected before a range
+    is expanded.
+    """
+    name, sep, values = spec.partition('=')
+    name = name.strip().replace('_', '-')
+    if not sep or name not in GRID_PARAMETERS:
+        raise ValueError(f"Bad grid axis {spec!r}, expected one of {', '.join(GRID_PARAMETERS)}=...")
+
+    param, cast = GRID_PARAMETERS[name]
+
+    if ':' in values:
+        parts = [cast(v) for v in values.split(':')]
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) > 2 else cast(1)
+        if step <= 0:
+            raise ValueError(f"Bad grid axis {spec!r}, step must be positive")
+        if not all(math.isfinite(v) for v in parts):
+            raise ValueError(f"Bad grid axis {spec!r}, range bounds must be finite")
+        count = int(round((stop - start) / step)) + 1
+        if max_values is not None and count > max_values:
+            raise ValueError(f"Grid axis {spec!r} has {count} values, at most {max_values} are allowed")
+        return param, [cast(start + i * step) for i in range(max(count, 0))]
+
+    values = [v for v in values.split(',') if v.strip()]
+    if max_values is not None and len(values) > max_values:
+        raise ValueError(f"Grid axis {spec!r} has {len(values)} values, at most {max_values} are allowed")
+    return param, [cast(v) for v in values]
+
+
+def grid_points(base, axes):
+    """Every combination of the axis values applied on top of ``base``."""
+    names = [name for name, _ in axes]
+    return [
+        {**base, **dict(zip(names, values))}
+        for values in itertools.product(*(values for _, values in axes))
+    ]
+
+
+# Sweep columns that ``analytic.estimate`` also predicts.
+ANALYTIC_METRICS = ('rejection_percent', 'avg_waiting_time', 'avg_sojourn_time', 'utilization_percent')
+
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+_CONDITION = re.compile(r'^\s*(\w+)\s*(<=|>=|<|>)\s*(\S+)\s*$')
+
+
+def parse_condition(spec):
+    """Parse a prescreen condition such as ``rejection_percent<20``."""
+    match = _CONDITION.match(spec)
+    if not match or match[1] not in ANALYTIC_METRICS:
+        raise ValueError(
+            f"Bad prescreen condition {spec!r}, expected METRIC<VALUE (or <=, >, >=) "
+            f"with METRIC one of {', '.join(ANALYTIC_METRICS)}"
+        )
+    try:
+        value = float(match[3])
+    except ValueError:
+        raise ValueError(f"Bad prescreen condition {spec!r}: {match[3]!r} is not a number") from None
+    return match[1], match[2], value
+
+
+def analytic_point(config):
+    """``ANALYTIC_METRICS`` of one grid point from the queueing model."""
+    result = estimate(**config)
+    return {name: result[name] for name in ANALYTIC_METRICS}
+
+
+def point_metrics(summary):
+    devices = summary['devices']
+    return {
+        'generated': summary['generated'],
+        'completed': summary['completed'],
+        'rejected': summary['rejected'],
+        'rejection_percent': summary['rejection_percent'],
+        'avg_waiting_time': summary['waiting_time']['mean'],
+        'p95_waiting_time': summary['waiting_time']['p95'],
+        'avg_service_time': summary['service_time']['mean'],
+        'avg_sojourn_time': summary['sojourn_time']['mean'],
+        'utilization_percent': (
+            sum(d['utilization_percent'] for d in devices) / len(devices) if devices else 0.0
+        ),
+    }
+
+
+def run_point(config, seed, replications):
+    """Metrics of one grid point; with replications, also their CI half-widths."""
+    rows = [point_metrics(s) for s in run_replications(config, replications, seed=seed)]
+
+    result = {}
+    for name in rows[0]:
+        mean, half_width = confidence_interval([r[name] for r in rows])
+        result[name] = mean
+        if replications > 1:
+            result[f'{name}_ci'] = half_width
+    return result
+
+
+def run_sequential_point(config, seed, precision, max_wall_time=None):
+    """Metrics of one grid point from a run stopped by ``stopping.run_sequential``.
+
+    Rejection percentage and mean waiting time are the post-warm-up
+    batch-means estimates, with their CI half-widths.
+    """
+    result = run_sequential(Simulation(**config, seed=seed), precision=precision, max_wall_time=max_wall_time)
+
+    row = point_metrics(result['summary'])
+    for name, m in result['metrics'].items():
+        row[name] = m['estimate']
+        row[f'{name}_ci'] = m['half_width']
+    row['warmup'] = result['warmup']
+    row['model_time'] = result['clock']
+    row['stopped'] = result['reason']
+    return row
+
+
+def run_sweep(points, seed=0, replications=1, workers=1, cache=None, progress=None,
+              precision=None, max_wall_time=None, prescreen=None, analytic=False):
+    """Run every configuration in ``points`` and return one row per point.
+
+    Points already in ``cache`` are not recomputed; new results are stored as
+    they complete. ``progress(done, total)`` is called after each point.
+    With ``precision``, each point is one sequential run stopped at that
+    relative precision (see ``run_sequential_point``) instead of
+    ``replications`` fixed-length runs.
+
+    ``prescreen`` is a list of ``parse_condition`` tuples: points whose
+    analytic estimates fail any of them are not simulated, and their rows
+    hold the analytic estimates with ``screened`` set. With ``analytic``,
+    every row also gets ``analytic_<metric>`` columns for comparison (see
+    ``validation_report``).
+    """
+    results = [None] * len(points)
+    cached = [False] * len(points)
+    pending = []
+    estimates = [analytic_point(config) for config in points] if prescreen or analytic else None
+    screened = [
+        not all(OPERATORS[op](e[name], value) for name, op, value in prescreen)
+        for e in estimates
+    ] if prescreen else [False] * len(points)
+
+    if precision is None:
+        job = partial(run_point, replications=replications)
+        settings = {'replications': replications}
+    else:
+        job = partial(run_sequential_point, precision=precision, max_wall_time=max_wall_time)
+        settings = {'precision': precision, 'max_wall_time': max_wall_time}
+
+    def key(config):
+        return {**config, **settings}
+
+    for i, config in enumerate(points):
+        if screened[i]:
+            results[i] = estimates[i]
+            continue
+        result = cache.get(key(config), seed) if cache else None
+        if result is None:
+            pending.append(i)
+        else:
+            results[i] = result
+            cached[i] = True
+
+    done = len(points) - len(pending)
+
+    def store(i, result):
+        nonlocal done
+        results[i] = result
+        if cache:
+            cache.put(key(points[i]), seed, result)
+        done += 1
+        if progress:
+            progress(done, len(points))
+
+    if workers <= 1:
+        for i in pending:
+            store(i, job(points[i], seed))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(job, points[i], seed): i for i in pending}
+            for future in as_completed(futures):
+                store(futures[future], future.result())
+
+    rows = [
+        {**config, **result, 'cached': was_cached}
+        for config, result, was_cached in zip(points, results, cached)
+    ]
+    for i, row in enumerate(rows):
+        if prescreen:
+            row['screened'] = screened[i]
+        if analytic:
+            row.update({f'analytic_{name}': value for name, value in estimates[i].items()})
+    return rows
+
+
+def validation_report(rows):
+    """Errors of the analytic estimates against the simulated sweep rows.
+
+    ``rows`` come from ``run_sweep(..., analytic=True)``; screened points are
+    skipped. Returns one dict per metric in ``ANALYTIC_METRICS`` with the
+    number of points, the mean and maximum absolute error and the mean
+    relative error (over points with a non-zero simulated value).
+    """
+    simulated = [row for row in rows if not row.get('screened')]
+    report = []
+    for name in ANALYTIC_METRICS:
+        errors = [row[f'analytic_{name}'] - row[name] for row in simulated]
+        relative = [abs(e) / abs(row[name]) for e, row in zip(errors, simulated) if row[name]]
+        report.append({
+            'metric': name,
+            'points': len(errors),
+            'mean_error': sum(errors) / len(errors) if errors else 0.0,
+            'mean_abs_error': sum(map(abs, errors)) / len(errors) if errors else 0.0,
+            'max_abs_error': max(map(abs, errors), default=0.0),
+            'mean_rel_error': sum(relative) / len(relative) if relative else 0.0,
+        })
+    return report
@@ -0,0 +1,96 @@
+import random
+
+from django.test import SimpleTestCase
+
+from app.buffer import IndexedBuffer
+from app.models import Buffer
+from app.records import Report, Source
+
+
+class ListBufferTests(SimpleTestCase):
+    """The list-based ``models.Buffer`` the indexed buffer is checked against."""
+
+    def test_batch_takes_every_report_of_the_head_source(self):
+        # Unsaved sources all have source_id None; batches must still split by source.
+        a, b = Source(0, "S1"), Source(1, "S2")
+        buffer = Buffer(size=5)
+        reports = [Report(i, source, 1, 0.0) for i, source in enumerate([a, b, a, b, a])]
+        for report in reports:
+            buffer.enqueue(report)
+
+        self.assertEqual([r.id for r in buffer.pull_tasks(None, batch_by_source=True)], [0, 2, 4])
+        self.assertEqual([r.id for r in buffer.queue], [1, 3])
+        self.assertTrue(all(reports[i].status == "in_progress" for i in (0, 2, 4)))
+
+    def test_single_pull_removes_only_the_head(self):
+        source = Source(0, "S1")
+        buffer = Buffer(size=3)
+        for i in range(3):
+            buffer.enqueue(Report(i, source, 1, 0.0))
+
+        self.assertEqual([r.id for r in buffer.pull_tasks(None, batch_by_source=False)], [0])
+        self.assertEqual([r.id for r in buffer.queue], [1, 2])
+
+    def test_eviction_takes_the_oldest_lowest_priority_report(self):
+        source = Source(0, "S1")
+        buffer = Buffer(size=3)
+        for i, priority in enumerate([2, 1, 1]):
+            buffer.enqueue(Report(i, source, priority, 0.0))
+
+        accepted, replaced = buffer.enqueue(Report(3, source, 2, 0.0))
+        self.assertTrue(accepted)
+        self.assertEqual(replaced.id, 1)
+        self.assertEqual([r.id for r in buffer.queue], [0, 2, 3])
+
+        accepted, replaced = buffer.enqueue(Report(4, source, 1, 0.0))
+        self.assertEqual((accepted, replaced), (False, None))
+
+
+class IndexedBufferTests(SimpleTestCase):
+    """``IndexedBuffer`` against ``models.Buffer`` on random operation sequences."""
+
+    def check_sequence(self, seed, operations):
+        rng = random.Random(seed)
+        size = rng.randint(1, 8)
+        sources = [Source(i, f"S{i + 1}") for i in range(rng.randint(1, 4))]
+        expected, actual = Buffer(size=size), IndexedBuffer(size=size)
+
+        for step in range(operations):
+            context = f"seed {seed}, step {step}"
+            if rng.random() < 0.6:
+                source, priority = rng.choice(sources), rng.randint(1, 4)
+                twins = Report(step, source, priority, float(step)), Report(step, source, priority, float(step))
+                results = [buffer.enqueue(report) for buffer, report in zip((expected, actual), twins)]
+                (accepted, replaced), (accepted_, replaced_) = results
+                self.assertEqual(accepted, accepted_, context)
+                self.assertEqual(replaced and replaced.id, replaced_ and replaced_.id, context)
+                self.assertEqual(twins[0].status, twins[1].status, context)
+            else:
+                batch_by_source = rng.random() < 0.5
+                pulled = expected.pull_tasks(None, batch_by_source)
+                pulled_ = actual.pull_tasks(None, batch_by_source)
+                self.assertEqual([r.id for r in pulled], [r.id for r in pulled_], context)
+                self.assertTrue(all(r.status == "in_progress" for r in pulled_), context)
+
+            self.assertEqual([r.id for r in expected.queue], [r.id for r in actual.queue], context)
+            self.assertEqual(len(actual), len(expected.queue), context)
+            self.assertEqual(actual.is_empty(), expected.is_empty(), context)
+
+    def test_matches_list_buffer(self):
+        for seed in range(300):
+            self.check_sequence(seed, 500)
+
+    def test_matches_list_buffer_through_compactions(self):
+        # Long runs leave enough stale heap entries behind to trigger compaction.
+        for seed in range(5):
+            self.check_sequence(seed, 5000)
+
+    def test_stale_entries_stay_bounded(self):
+        source = Source(0, "S1")
+        buffer = IndexedBuffer(size=3)
+        for i in range(10_000):
+            buffer.enqueue(Report(i, source, 1 + i % 4, 0.0))
+            if i % 2:
+                buffer.pull_tasks(None, batch_by_source=False)
+        self.assertLessEqual(len(buffer._by_priority), 2 * len(buffer) + 64)
+        self.assertLessEqual(len(buffer._order), 2 * len(buffer) + 64 + 1)
@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+
+from app.ensemble import Ensemble
+from app.simulation import Simulation
+
+CONFIG = dict(lambda_rate=2.0, duration=200.0, delta=0.5, buffer_size=4, num_devices=2, num_sources=3,
+              arrivals='poisson', service='exponential')
+
+
+class EnsembleSummaryTests(SimpleTestCase):
+    def test_time_statistics_have_the_simulation_keys(self):
+        expected = Simulation(**CONFIG, seed=0).run()
+        for summary in Ensemble(4, **CONFIG, seed=0).run():
+            for name in ('waiting_time', 'service_time', 'sojourn_time'):
+                stats = summary[name]
+                self.assertEqual(stats.keys(), expected[name].keys())
+                self.assertLessEqual(stats['min'], stats['mean'])
+                self.assertLessEqual(stats['mean'], stats['max'])
+                self.assertGreater(stats['variance'], 0)
+            wait, service, sojourn = (summary[name] for name in ('waiting_time', 'service_time', 'sojourn_time'))
+            self.assertAlmostEqual(sojourn['mean'], wait['mean'] + service['mean'])
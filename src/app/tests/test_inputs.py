@@ -0,0 +1,57 @@
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from app.inputs import FileArrivals, InputError, parse_chunks
+from app.simulation import Simulation
+
+
+class FileArrivalsTests(SimpleTestCase):
+    def log(self, rows, header="timestamp,researcher,priority"):
+        path = Path(tempfile.mkdtemp()) / 'log.csv'
+        path.write_text('\n'.join([header, *rows]) + '\n', encoding='utf-8')
+        return FileArrivals(path, chunk_size=2)
+
+    def test_rows_stream_across_chunks(self):
+        arrivals = self.log(["10,r1,1", "11,r2,4", "11,r1,2", "13.5,7,3"])
+        self.assertEqual(list(arrivals.stream()), [(0.0, 'r1', 1), (1.0, 'r2', 4), (1.0, 'r1', 2), (3.5, '7', 3)])
+        self.assertEqual(arrivals.end_time(), 3.5)
+
+    def test_time_scale_and_date_times(self):
+        arrivals = self.log(["2025-01-01T00:00:00Z,a,1", "2025-01-01T00:01:00Z,b,2"])
+        arrivals.time_scale = 0.5
+        self.assertEqual([t for t, _, _ in arrivals.stream()], [0.0, 30.0])
+
+    def test_invalid_priorities_name_their_row(self):
+        for value in ("high", "2.5", "0", "5", ""):
+            arrivals = self.log(["0,a,1", "1,a,2", f"2,a,{value}"])
+            with self.assertRaisesRegex(InputError, "Input row 3 has priority"):
+                list(arrivals.stream())
+
+    def test_unparsable_date_times_name_their_row(self):
+        arrivals = self.log(["2025-01-01T00:00:00Z,a,1", "not-a-date,a,2", "2025-01-01T00:01:00Z,b,2"])
+        with self.assertRaisesRegex(InputError, "Input row 2 is missing its timestamp"):
+            list(arrivals.stream())
+        with self.assertRaisesRegex(InputError, "Input row 2 is missing its timestamp"):
+            arrivals.end_time()
+
+    def test_researchers_are_text_whatever_the_column_type(self):
+        chunk = pd.DataFrame({'timestamp': [0.0, 1.0], 'researcher': [7, 8], 'priority': [1, 2]})
+        [(_, researchers, _)] = parse_chunks([chunk])
+        self.assertEqual(researchers, ['7', '8'])
+
+    def test_out_of_order_rows_are_rejected(self):
+        arrivals = self.log(["0,a,1", "2,a,2", "1,a,3"])
+        with self.assertRaisesRegex(InputError, "Input row 3"):
+            list(arrivals.stream())
+
+    def test_simulation_replays_the_log(self):
+        arrivals = self.log(["0,a,1", "0.2,b,2", "0.7,a,3", "3,c,4"])
+        sim = Simulation(lambda_rate=0, duration=arrivals.end_time(), delta=0.5, buffer_size=3, num_devices=1,
+                         num_sources=1, arrivals=arrivals, seed=0)
+        summary = sim.run()
+        self.assertEqual(summary['generated'], 4)
+        self.assertEqual([s.name for s in sim.sources], ['a', 'b', 'c'])
+        self.assertEqual([s.generated_count for s in sim.sources], [2, 1, 1])
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import tempfile
+import time
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from app import jobs
+from app.jobs import MAX_GRID_CELLS, MAX_TICKS, job_config
+
+
+class JobConfigLimitTests(SimpleTestCase):
+    def assertRejected(self, data):
+        with self.assertRaises(ValueError):
+            job_config(data)
+
+    def test_defaults_are_accepted(self):
+        config = job_config({'params': {'duration': 100}})
+        self.assertEqual(config['params']['duration'], 100.0)
+
+    def test_oversized_parameters_are_rejected(self):
+        for name, value in [('buffer_size', 10**9), ('num_devices', 10**6), ('num_sources', 10**6)]:
+            self.assertRejected({'params': {name: value}})
+
+    def test_tick_and_arrival_counts_are_bounded(self):
+        self.assertRejected({'params': {'duration': MAX_TICKS, 'delta': 0.5}})
+        self.assertRejected({'params': {'duration': 1e6, 'lambda_rate': 1000}})
+
+    def test_grid_size_is_bounded(self):
+        self.assertRejected({'kind': 'sweep', 'grid': [f"operators=1:{MAX_GRID_CELLS + 1}"]})
+        self.assertRejected({'kind': 'sweep', 'grid': ["operators=1:100", "buffer-size=1:100"]})
+        self.assertRejected({'kind': 'sweep', 'grid': ["lambda=1:inf"]})
+        self.assertRejected({'kind': 'sweep', 'grid': ["operators=1:10"], 'replications': 10**6})
+
+    def test_grid_points_are_checked(self):
+        self.assertRejected({'kind': 'sweep', 'grid': ["duration=10,1e7"], 'params': {'delta': 0.5}})
+        config = job_config({'kind': 'sweep', 'grid': ["operators=1:10", "lambda=0.5,1"], 'replications': 5})
+        self.assertEqual(config['replications'], 5)
+
+
+class JobApiTests(SimpleTestCase):
+    """The test client runs every async view in an event loop of its own, as WSGI does."""
+
+    def setUp(self):
+        self.settings_override = override_settings(
+            ALLOWED_HOSTS=['testserver'], SIMULATION_JOB_WORKERS=1, SIMULATION_JOB_CACHE_DIR=tempfile.mkdtemp(),
+        )
+        self.settings_override.enable()
+        jobs._manager = None
+
+    def tearDown(self):
+        if jobs._manager is not None:
+            jobs._manager._pool.shutdown()
+            jobs._manager._mp_manager.shutdown()
+        jobs._manager = None
+        self.settings_override.disable()
+
+    def post(self, data):
+        return self.client.post(reverse('jobs'), json.dumps(data), content_type='application/json')
+
+    def wait(self, job_id, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.client.get(reverse('job', args=[job_id])).json()
+            if job['status'] in (jobs.DONE, jobs.FAILED):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_jobs_finish_across_request_loops(self):
+        data = {'params': {'duration': 200, 'num_devices': 3}, 'seed': 1}
+        response = self.post(data)
+        self.assertEqual(response.status_code, 202)
+        job = self.wait(response.json()['id'])
+        self.assertEqual(job['status'], jobs.DONE)
+        self.assertEqual(job['result']['generated'], 200)
+
+        again = self.post(data)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['id'], job['id'])
+
+        response = self.client.get(reverse('job-events', args=[job['id']]))
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        events = asyncio.run(read())
+        self.assertIn(b'event: result', events)
+
+    def test_oversized_jobs_are_rejected(self):
+        response = self.post({'params': {'buffer_size': 10**9}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('buffer_size', response.json()['error'])
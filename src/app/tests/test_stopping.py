@@ -0,0 +1,28 @@
+from math import inf
+
+from django.test import SimpleTestCase
+
+from app.sim import main
+from app.simulation import Simulation
+from app.stopping import run_sequential
+
+
+class IdleSequentialRunTests(SimpleTestCase):
+    """A sequential run with nothing left to happen stops instead of spinning."""
+
+    def test_event_engine_without_arrivals_stops_as_idle(self):
+        sim = Simulation(num_sources=1, lambda_rate=0, duration=inf, delta=1, buffer_size=3,
+                         num_devices=1, engine='event', seed=1)
+        result = run_sequential(sim, max_wall_time=5)
+        self.assertEqual(result['reason'], 'idle')
+        self.assertEqual(result['clock'], 0)
+
+    def test_idle_step_keeps_the_clock(self):
+        sim = Simulation(num_sources=1, lambda_rate=0, duration=inf, delta=1, buffer_size=3,
+                         num_devices=1, engine='event', seed=1)
+        self.assertEqual(sim.step(), [])
+        self.assertEqual(sim.clock, 0)
+
+    def test_sequential_mode_rejects_non_positive_lambda(self):
+        with self.assertRaises(SystemExit):
+            main(['--mode', 'sequential', '--engine', 'event', '--lambda', '0'])
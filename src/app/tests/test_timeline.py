@@ -0,0 +1,32 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from app.simulation import Simulation
+from app.timeline import MAX_SOURCE_LANES, Timeline
+
+
+class TimelineTests(SimpleTestCase):
+    def run_timeline(self, num_sources, width=300):
+        sim = Simulation(lambda_rate=4.0, duration=100.0, delta=0.5, buffer_size=5, num_devices=3,
+                         num_sources=num_sources, engine='event', arrivals='poisson', seed=0)
+        timeline = Timeline.for_simulation(sim, width=width)
+        sim.trace = timeline
+        sim.run()
+        timeline.close(sim.clock)
+        return sim, timeline
+
+    def test_source_marks_are_bounded_by_the_diagram(self):
+        sim, timeline = self.run_timeline(10_000)
+        self.assertEqual(len(timeline.source_names), MAX_SOURCE_LANES)
+        self.assertEqual(timeline.source_names[-1], f"+{10_000 - MAX_SOURCE_LANES + 1}")
+        self.assertLessEqual(len(timeline.marks), MAX_SOURCE_LANES)
+        self.assertTrue(all(m.dtype == np.uint8 and m.shape == (3, 300) for m in timeline.marks.values()))
+        self.assertIn(MAX_SOURCE_LANES - 1, timeline.marks)
+        self.assertIn('<svg', timeline.svg())
+        self.assertEqual(timeline.raster().shape[1], 360)
+
+    def test_only_sources_with_events_get_marks(self):
+        sim, timeline = self.run_timeline(20)
+        active = {s.index for s in sim.sources if s.generated_count}
+        self.assertEqual(set(timeline.marks), active)
+        self.assertEqual(len(timeline.source_names), 20)
@@ -0,0 +1,67 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from app import trace
+from app.simulation import Simulation
+from app.trace import STARTED, TraceReader, TraceWriter
+
+
+class RecordingEvents:
+    """Wraps the reader's events and records where every slice starts."""
+
+    def __init__(self, events):
+        self.events = events
+        self.starts = []
+
+    def __len__(self):
+        return len(self.events)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            self.starts.append(key.start or 0)
+        return self.events[key]
+
+
+class StateAtTests(SimpleTestCase):
+    def write_trace(self, num_devices):
+        path = Path(tempfile.mkdtemp()) / 'run.trace'
+        sim = Simulation(lambda_rate=2.0, duration=500.0, delta=0.5, buffer_size=4, num_devices=num_devices,
+                         num_sources=3, engine='event', arrivals='poisson', seed=0)
+        with TraceWriter(path) as writer:
+            sim.trace = writer
+            writer.attach(sim)
+            sim.run()
+            writer.metadata['end_time'] = sim.clock
+        return TraceReader(path)
+
+    def expected_devices(self, reader, time):
+        """Busy-until of every device from a full forward pass."""
+        events = np.asarray(reader.events[:reader.index_at(time)])
+        until = [None] * len(reader.metadata['devices'])
+        for row in events[events['kind'] == STARTED]:
+            until[row['device']] = float(row['until'])
+        return [u if u is not None and u > time else None for u in until]
+
+    def test_devices_match_a_full_pass(self):
+        reader = self.write_trace(num_devices=3)
+        with mock.patch.object(trace, 'CHECKPOINT_EVENTS', 64):
+            for time in np.linspace(0, 500, 101):
+                state = reader.state_at(time)
+                self.assertEqual([d['busy_until'] for d in state['devices']], self.expected_devices(reader, time))
+
+    def test_scan_stops_at_the_checkpoint_with_idle_devices(self):
+        # Far more devices than dispatches: most are never used.
+        reader = self.write_trace(num_devices=5000)
+        with mock.patch.object(trace, 'CHECKPOINT_EVENTS', 64):
+            reader.state_at(0)
+            reader.events = RecordingEvents(reader.events)
+            for time in np.linspace(250, 500, 26):
+                end = reader.index_at(time)
+                reader.events.starts.clear()
+                state = reader.state_at(time)
+                self.assertGreaterEqual(min(reader.events.starts), end // 64 * 64)
+                self.assertEqual([d['busy_until'] for d in state['devices']], self.expected_devices(reader, time))
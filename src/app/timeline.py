@@ -0,0 +1,335 @@
+"""ОД3 timing diagrams of sources, buffer slots and devices.
+
+``Timeline`` consumes simulation events one at a time, either live as the
+``trace`` sink of a ``Simulation`` or replayed from a recorded trace, and
+keeps one lane per source, buffer slot and device. Intervals are snapped to
+the pixel columns of the target width as they arrive: an interval that
+touches the previous one of its lane, or shares a pixel column with it, is
+merged into it, and the merged span remembers which fraction of its time was
+covered. A lane therefore never holds more than ``width`` spans. A source
+lane is a bitmap of the pixel columns with events, allocated when the source
+first has an event in the window; beyond ``MAX_SOURCE_LANES`` sources the
+rest share one aggregate lane. Memory is bounded by the diagram size whatever
+the length of the run or the number of sources.
+
+``render_trace`` draws any window of a recorded trace: the state at the start
+of the window comes from ``TraceReader.state_at`` and only the events inside
+the window are read, so the cost does not depend on the rest of the run.
+
+Buffer lanes are a drawing choice, not the model's positions: the Д1ОЗ2
+buffer keeps its reports in order and shifts them up when one is removed,
+while here an accepted report takes the lowest free lane and stays in it
+until it leaves. A lane thus shows one report's whole stay, and a removal
+touches one lane instead of every report behind it. The occupancy at any
+instant (the number of filled lanes) matches the buffer. The SVG has lane
+labels and a time axis; the PNG is written without dependencies and has no
+text.
+"""
+import heapq
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from .trace import ACCEPTED, EVICTED, REJECTED, STARTED
+
+DEFAULT_WIDTH = 1200
+
+LANE_HEIGHT = 12
+LANE_GAP = 4
+LABEL_WIDTH = 60
+AXIS_HEIGHT = 20
+
+# Source lane marks, in drawing order.
+MARKS = ('accepted', 'evicted', 'rejected')
+
+# Source lanes drawn individually; the last one aggregates every further source.
+MAX_SOURCE_LANES = 32
+MARK_COLORS = ('#2e7d32', '#ef6c00', '#c62828')
+
+PRIORITY_COLORS = {1: '#90caf9', 2: '#42a5f5', 3: '#1e88e5', 4: '#0d47a1'}
+SOURCE_COLORS = ('#8e24aa', '#00897b', '#f4511e', '#3949ab', '#7cb342', '#6d4c41', '#d81b60', '#546e7a')
+MIXED_COLOR = '#9e9e9e'
+
+
+class Lane:
+    """Pixel-snapped busy intervals of one buffer lane or device."""
+
+    __slots__ = ('name', 'start', 'scale', 'width', 'spans')
+
+    def __init__(self, name, start, end, width):
+        self.name = name
+        self.start = start
+        self.scale = width / (end - start)
+        self.width = width
+        # [first column, last column, first time, last time, covered time, label]
+        self.spans = []
+
+    def add(self, begin, end, label):
+        x0 = (begin - self.start) * self.scale
+        x1 = (end - self.start) * self.scale
+        if x1 <= 0 or x0 >= self.width or end <= begin:
+            return
+        first = max(int(x0), 0)
+        last = min(int(math.ceil(x1)) - 1, self.width - 1)
+        covered = min(x1, self.width) - max(x0, 0)
+
+        spans = self.spans
+        if spans:
+            span = spans[-1]
+            if first <= span[1] or (begin <= span[3] and label == span[5]):
+                span[1] = max(span[1], last)
+                span[3] = end
+                span[4] += covered
+                if span[5] != label:
+                    span[5] = None
+                return
+        spans.append([first, last, begin, end, covered, label])
+
+    def rectangles(self):
+        """``(x, width, density, label)`` of every span, in pixel columns."""
+        for first, last, _, _, covered, label in self.spans:
+            width = last - first + 1
+            yield first, width, min(covered / width, 1.0), label
+
+
+class Timeline:
+    """Incremental ОД3 diagram of the window ``[start, end]`` at ``width`` pixels.
+
+    Pass it as ``Simulation(trace=...)`` to build the diagram while the run
+    goes, or feed it events with ``record``/``feed``.
+    """
+
+    def __init__(self, sources, devices, buffer_size, start, end, width=DEFAULT_WIDTH):
+        if end <= start:
+            raise ValueError("The timeline window must have end > start")
+        self.start = start
+        self.end = end
+        self.width = width
+        names = list(sources)
+        if len(names) > MAX_SOURCE_LANES:
+            names = names[:MAX_SOURCE_LANES - 1] + [f"+{len(names) - MAX_SOURCE_LANES + 1}"]
+        self.source_names = names
+        # Source lane -> (len(MARKS), width) bitmap of the columns with events.
+        self.marks = {}
+        self.slots = [Lane(f"Б{i + 1}", start, end, width) for i in range(buffer_size)]
+        self.devices = [Lane(name, start, end, width) for name in devices]
+
+        self._free = list(range(buffer_size))
+        self._open = {}
+        self._batches = [None] * len(self.devices)
+
+    @classmethod
+    def for_simulation(cls, sim, start=0.0, end=None, width=DEFAULT_WIDTH):
+        return cls([s.name for s in sim.sources], [d.name for d in sim.devices], sim.buffer.size,
+                   start, sim.duration if end is None else end, width)
+
+    def attach(self, sim):
+        """Trace sink interface; the lanes are already set up."""
+
+    def close(self, end_time=None):
+        self.finish(end_time)
+
+    def place(self, report, priority, submitted):
+        """Put a report that is already buffered when the window opens."""
+        slot = heapq.heappop(self._free)
+        self._open[report] = (slot, submitted, priority)
+
+    def occupy(self, device, until, source=None):
+        """Mark a device that is busy when the window opens."""
+        self._batches[device] = (self.start, until)
+        self.devices[device].add(self.start, until, source)
+
+    def record(self, time, kind, report, device, until, queue):
+        """Trace sink interface: one event of a live ``Simulation``."""
+        self.event(time, kind, report.id, report.source.index, report.priority, device, until)
+
+    def event(self, time, kind, report, source, priority, device, until):
+        column = int((time - self.start) * self.width / (self.end - self.start))
+        if kind != STARTED and 0 <= column < self.width:
+            mark = MARKS.index('rejected' if kind == REJECTED else 'evicted' if kind == EVICTED else 'accepted')
+            lane = min(source, MAX_SOURCE_LANES - 1)
+            marks = self.marks.get(lane)
+            if marks is None:
+                marks = self.marks[lane] = np.zeros((len(MARKS), self.width), dtype=np.uint8)
+            marks[mark, column] = 1
+
+        if kind == ACCEPTED:
+            if self._free:
+                self._open[report] = (heapq.heappop(self._free), time, priority)
+        elif kind in (EVICTED, STARTED):
+            opened = self._open.pop(report, None)
+            if opened is not None:
+                slot, since, label = opened
+                self.slots[slot].add(since, time, label)
+                heapq.heappush(self._free, slot)
+            if kind == STARTED and self._batches[device] != (time, until):
+                self._batches[device] = (time, until)
+                self.devices[device].add(time, until, source)
+
+    def feed(self, rows):
+        """Consume a chunk of ``TRACE_DTYPE`` records in time order."""
+        event = self.event
+        for time, kind, report, source, priority, device, until in zip(
+            rows['time'].tolist(), rows['kind'].tolist(), rows['report'].tolist(), rows['source'].tolist(),
+            rows['priority'].tolist(), rows['device'].tolist(), rows['until'].tolist(),
+        ):
+            event(time, kind, report, source, priority, device, until)
+
+    def finish(self, end_time=None):
+        """Close the intervals of reports still buffered at the end of the window."""
+        end = self.end if end_time is None else min(end_time, self.end)
+        for slot, since, label in self._open.values():
+            self.slots[slot].add(since, end, label)
+        self._open.clear()
+
+    # Rendering
+
+    def lanes(self):
+        """``(name, kind, lane)`` of every row of the diagram, top to bottom."""
+        rows = [(name, 'source', i) for i, name in enumerate(self.source_names)]
+        rows += [(lane.name, 'slot', lane) for lane in self.slots]
+        rows += [(lane.name, 'device', lane) for lane in self.devices]
+        return rows
+
+    def _color(self, kind, label):
+        if label is None:
+            return MIXED_COLOR
+        if kind == 'slot':
+            return PRIORITY_COLORS.get(label, MIXED_COLOR)
+        return SOURCE_COLORS[label % len(SOURCE_COLORS)]
+
+    def ticks(self, target=10):
+        """Evenly spaced round instants for the time axis."""
+        span = self.end - self.start
+        raw = span / target
+        magnitude = 10 ** math.floor(math.log10(raw))
+        step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+        first = math.ceil(self.start / step) * step
+        return [first + i * step for i in range(int((self.end - first) / step + 1e-9) + 1)]
+
+    def _x(self, time):
+        return (time - self.start) * self.width / (self.end - self.start)
+
+    def svg(self):
+        rows = self.lanes()
+        height = len(rows) * (LANE_HEIGHT + LANE_GAP) + AXIS_HEIGHT
+        total_width = LABEL_WIDTH + self.width
+        out = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_width}" height="{height}" '
+            f'font-family="sans-serif" font-size="10">',
+            f'<rect width="{total_width}" height="{height}" fill="white"/>',
+        ]
+
+        for index, (name, kind, lane) in enumerate(rows):
+            y = index * (LANE_HEIGHT + LANE_GAP)
+            out.append(f'<text x="4" y="{y + LANE_HEIGHT - 2}">{name}</text>')
+            out.append(f'<g transform="translate({LABEL_WIDTH},{y})">')
+            out.append(f'<line x1="0" y1="{LANE_HEIGHT}" x2="{self.width}" y2="{LANE_HEIGHT}" stroke="#e0e0e0"/>')
+            if kind == 'source':
+                marks = self.marks.get(lane)
+                for mark, color in enumerate(MARK_COLORS if marks is not None else ()):
+                    columns = np.flatnonzero(marks[mark])
+                    if len(columns):
+                        path = ''.join(f'M{x}.5 0v{LANE_HEIGHT}' for x in columns.tolist())
+                        out.append(f'<path d="{path}" stroke="{color}"/>')
+            else:
+                for x, width, density, label in lane.rectangles():
+                    opacity = '' if density >= 0.999 else f' fill-opacity="{density:.2f}"'
+                    out.append(
+                        f'<rect x="{x}" y="1" width="{width}" height="{LANE_HEIGHT - 2}" '
+                        f'fill="{self._color(kind, label)}"{opacity}/>'
+                    )
+            out.append('</g>')
+
+        axis = len(rows) * (LANE_HEIGHT + LANE_GAP)
+        out.append(f'<g transform="translate({LABEL_WIDTH},{axis})">')
+        out.append(f'<line x1="0" y1="0" x2="{self.width}" y2="0" stroke="black"/>')
+        for t in self.ticks():
+            x = self._x(t)
+            out.append(f'<line x1="{x:.1f}" y1="0" x2="{x:.1f}" y2="4" stroke="black"/>')
+            out.append(f'<text x="{x:.1f}" y="15" text-anchor="middle">{t:g}</text>')
+        out.append('</g></svg>')
+        return '\n'.join(out)
+
+    def raster(self):
+        """The diagram as an ``(height, width, 3)`` RGB array, without labels."""
+        rows = self.lanes()
+        height = len(rows) * (LANE_HEIGHT + LANE_GAP) + AXIS_HEIGHT
+        image = np.full((height, LABEL_WIDTH + self.width, 3), 255, dtype=np.uint8)
+        left = LABEL_WIDTH
+
+        for index, (name, kind, lane) in enumerate(rows):
+            y = index * (LANE_HEIGHT + LANE_GAP)
+            image[y + LANE_HEIGHT, left:] = 224
+            if kind == 'source':
+                marks = self.marks.get(lane)
+                for mark, color in enumerate(MARK_COLORS if marks is not None else ()):
+                    columns = np.flatnonzero(marks[mark])
+                    image[y:y + LANE_HEIGHT, left + columns] = _rgb(color)
+            else:
+                for x, width, density, label in lane.rectangles():
+                    color = _rgb(self._color(kind, label))
+                    blended = 255 - density * (255 - color)
+                    image[y + 1:y + LANE_HEIGHT - 1, left + x:left + x + width] = blended.astype(np.uint8)
+
+        axis = len(rows) * (LANE_HEIGHT + LANE_GAP)
+        image[axis, left:] = 0
+        for t in self.ticks():
+            x = min(int(self._x(t)), self.width - 1)
+            image[axis:axis + 5, left + x] = 0
+        return image
+
+    def save(self, path):
+        """Write the diagram as SVG, or PNG when ``path`` ends with ``.png``."""
+        path = str(path)
+        if path.endswith('.png'):
+            write_png(path, self.raster())
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.svg())
+
+
+def _rgb(color):
+    return np.array([int(color[i:i + 2], 16) for i in (1, 3, 5)], dtype=float)
+
+
+def write_png(path, image):
+    """Write an ``(height, width, 3)`` uint8 array as an 8-bit RGB PNG."""
+    height, width, _ = image.shape
+    # Every scanline starts with filter type 0 (none).
+    raw = np.concatenate((np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)), axis=1)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b'IEND', b''))
+
+
+def render_trace(reader, start=None, end=None, width=DEFAULT_WIDTH):
+    """``Timeline`` of the window ``[start, end]`` of a ``TraceReader``.
+
+    The window defaults to the whole run.
+    """
+    metadata = reader.metadata
+    start = 0.0 if start is None else start
+    end = reader.end_time if end is None else end
+    timeline = Timeline(metadata['sources'], metadata['devices'], metadata['buffer_size'], start, end, width)
+
+    if start > 0:
+        state = reader.state_at(start)
+        for r in state['buffer']:
+            timeline.place(r['report'], r['priority'], max(r['submitted'], start))
+        for index, device in enumerate(state['devices']):
+            if device['busy_until'] is not None:
+                timeline.occupy(index, device['busy_until'])
+
+    for chunk in reader.chunks(reader.index_at(start) if start > 0 else 0, reader.index_at(end)):
+        timeline.feed(chunk)
+    timeline.finish(reader.end_time)
+    return timeline
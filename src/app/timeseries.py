@@ -0,0 +1,137 @@
+"""Columnar per-step time series of a simulation run."""
+import numpy as np
+
+COLUMNS = (
+    ('time', np.float64),
+    ('buffer_count', np.int32),
+    ('busy_devices', np.int32),
+    ('events_count', np.int32),
+    ('rejection_percent', np.float64),
+)
+
+DECIMATIONS = ('stride', 'minmax')
+
+
+class TimeSeries:
+    """Per-step samples stored in preallocated NumPy columns.
+
+    Columns start at ``capacity`` rows and double when full. Every ``every``
+    samples form a window that is stored as one row: with ``'stride'``
+    decimation the last sample of the window, with ``'minmax'`` the minimum
+    and maximum of each value over the window (``<column>_min`` and
+    ``<column>_max``), so spikes survive decimation.
+
+    With ``max_points`` the series never grows beyond that many rows: when it
+    is reached, adjacent rows are merged pairwise and the window doubles,
+    keeping memory bounded for arbitrarily long runs.
+    """
+
+    def __init__(self, every=1, decimate='stride', max_points=None, capacity=1024):
+        if decimate not in DECIMATIONS:
+            raise ValueError(f"Unknown decimation {decimate!r}, expected one of {DECIMATIONS}")
+
+        self.every = max(int(every), 1)
+        self.decimate = decimate
+        self.max_points = max_points + max_points % 2 if max_points else None
+        self._size = 0
+
+        if decimate == 'minmax':
+            names = [('time', np.float64)]
+            for name, dtype in COLUMNS[1:]:
+                names += [(f'{name}_min', dtype), (f'{name}_max', dtype)]
+        else:
+            names = list(COLUMNS)
+
+        self._columns = {name: np.empty(capacity, dtype) for name, dtype in names}
+        self._window = 0
+        self._last = None
+        self._low = None
+        self._high = None
+
+    def __len__(self):
+        return self._size
+
+    def append(self, time, buffer_count, busy_devices, events_count, rejection_percent):
+        values = (buffer_count, busy_devices, events_count, rejection_percent)
+        self._last = (time,) + values
+        self._window += 1
+
+        if self.decimate == 'minmax':
+            if self._low is None:
+                self._low = list(values)
+                self._high = list(values)
+            else:
+                low, high = self._low, self._high
+                for i, v in enumerate(values):
+                    if v < low[i]:
+                        low[i] = v
+                    elif v > high[i]:
+                        high[i] = v
+            if self._window >= self.every:
+                self._write_minmax(time)
+        elif self._window >= self.every:
+            self._write(self._last)
+
+    def finish(self):
+        """Store the incomplete last window, if any."""
+        if not self._window:
+            return
+        if self.decimate == 'minmax':
+            self._write_minmax(self._last[0])
+        else:
+            self._write(self._last)
+
+    def _write_minmax(self, time):
+        row = [time]
+        for low, high in zip(self._low, self._high):
+            row += [low, high]
+        self._low = self._high = None
+        self._write(row)
+
+    def _write(self, row):
+        self._window = 0
+        if self._size == len(self._columns['time']):
+            self._grow()
+
+        for (name, column), value in zip(self._columns.items(), row):
+            column[self._size] = value
+        self._size += 1
+
+        if self.max_points and self._size >= self.max_points:
+            self._compact()
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.empty(2 * len(column), column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _compact(self):
+        n = self._size
+        for name, column in self._columns.items():
+            if name.endswith('_min'):
+                merged = np.minimum(column[0:n:2], column[1:n:2])
+            elif name.endswith('_max'):
+                merged = np.maximum(column[0:n:2], column[1:n:2])
+            else:
+                merged = column[1:n:2]
+            column[:n // 2] = merged
+        self._size = n // 2
+        self.every *= 2
+
+    def columns(self):
+        """Views of the stored columns, one array per column."""
+        return {name: column[:self._size] for name, column in self._columns.items()}
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.columns())
+
+    def save(self, path):
+        """Write the series to ``path`` as Parquet (``.parquet``) or CSV."""
+        frame = self.to_frame()
+        if str(path).endswith('.parquet'):
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
@@ -0,0 +1,303 @@
+"""Binary event trace of a simulation run and tools to analyze it afterwards.
+
+A trace is a flat file of fixed-width records (``TRACE_DTYPE``) written in
+large chunks, plus a JSON sidecar (``<path>.json``) describing the run. The
+reader maps the file with ``numpy.memmap`` and works through it chunk by chunk,
+so traces far larger than memory can be analyzed or replayed to any instant
+without re-running the simulation.
+"""
+import json
+import math
+
+import numpy as np
+
+TRACE_VERSION = 1
+
+TRACE_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('kind', 'u1'),
+    ('report', '<i8'),
+    ('source', '<i4'),
+    ('priority', 'i1'),
+    ('submitted', '<f8'),
+    ('device', '<i4'),
+    ('until', '<f8'),
+    ('queue', '<i4'),
+])
+
+# Event kinds. EVICTED is a buffered report pushed out by a higher-priority
+# arrival (Д1ОО2); STARTED is written once per report of a dispatched batch.
+ACCEPTED, REJECTED, EVICTED, STARTED = range(4)
+KIND_NAMES = ('accepted', 'rejected', 'evicted', 'started')
+
+CHUNK_SIZE = 1 << 16
+READ_CHUNK_SIZE = 1 << 20
+
+# Events between the device-state checkpoints of ``TraceReader.state_at``.
+CHECKPOINT_EVENTS = 1 << 16
+
+
+class TraceWriter:
+    """Trace sink passed to ``Simulation(trace=...)``.
+
+    Records are collected as tuples and converted to ``TRACE_DTYPE`` once per
+    ``chunk_size`` events, keeping the per-event cost to a tuple append.
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = str(path)
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.metadata = {}
+        self._sources = []
+        self._file = open(self.path, 'wb')
+        self._rows = []
+
+    def attach(self, sim):
+        # Replayed runs add sources as researchers appear; names are taken on close.
+        self._sources = sim.sources
+        self.metadata = {
+            'version': TRACE_VERSION,
+            'dtype': TRACE_DTYPE.descr,
+            'sources': [s.name for s in sim.sources],
+            'devices': [d.name for d in sim.devices],
+            'buffer_size': sim.buffer.size,
+            'lambda_rate': sim.lambda_rate,
+            'duration': sim.duration,
+            'delta': sim.delta,
+            'engine': sim.engine,
+        }
+
+    def record(self, time, kind, report, device, until, queue):
+        self._rows.append((
+            time, kind, report.id, report.source.index, report.priority,
+            report.submitted_time, device, until, queue,
+        ))
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            np.array(self._rows, dtype=TRACE_DTYPE).tofile(self._file)
+            self.count += len(self._rows)
+            self._rows = []
+        self._file.flush()
+
+    def close(self, end_time=None):
+        self.flush()
+        self._file.close()
+        self.metadata['events'] = self.count
+        self.metadata['sources'] = [s.name for s in self._sources]
+        self.metadata['end_time'] = end_time
+        with open(f"{self.path}.json", 'w', encoding='utf-8') as f:
+            json.dump(self.metadata, f, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _last_dispatch(chunk, until):
+    """Update ``until`` with the busy-until of each device's last dispatch in ``chunk``."""
+    started = chunk[chunk['kind'] == STARTED][::-1]
+    seen, latest = np.unique(started['device'], return_index=True)
+    until[seen] = started['until'][latest]
+
+
+class TraceReader:
+    def __init__(self, path):
+        self.path = str(path)
+        with open(f"{self.path}.json", encoding='utf-8') as f:
+            self.metadata = json.load(f)
+
+        if self.metadata.get('version') != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {self.metadata.get('version')!r}")
+
+        self.events = (
+            np.memmap(self.path, dtype=TRACE_DTYPE, mode='r')
+            if self.metadata['events'] else np.empty(0, dtype=TRACE_DTYPE)
+        )
+        self._checkpoints = None
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def end_time(self):
+        if self.metadata.get('end_time') is not None:
+            return self.metadata['end_time']
+        return float(self.events['time'][-1]) if len(self) else 0.0
+
+    def chunks(self, start=0, stop=None, chunk_size=READ_CHUNK_SIZE):
+        stop = len(self) if stop is None else stop
+        for begin in range(start, stop, chunk_size):
+            yield np.asarray(self.events[begin:min(begin + chunk_size, stop)])
+
+    def index_at(self, time):
+        """Number of events that happened at or before ``time``."""
+        return int(np.searchsorted(self.events['time'], time, side='right'))
+
+    def analyze(self):
+        """Recompute the run summary in one streaming pass over the trace."""
+        n_sources = len(self.metadata['sources'])
+        n_devices = len(self.metadata['devices'])
+
+        generated = np.zeros(n_sources, dtype=np.int64)
+        rejected = np.zeros(n_sources, dtype=np.int64)
+        completed = np.zeros(n_sources, dtype=np.int64)
+        wait = np.zeros(n_sources)
+        service = np.zeros(n_sources)
+        busy_time = np.zeros(n_devices)
+        processed = np.zeros(n_devices, dtype=np.int64)
+
+        previous = None
+        for chunk in self.chunks():
+            kind = chunk['kind']
+            source = chunk['source']
+
+            arrived = (kind == ACCEPTED) | (kind == REJECTED)
+            generated += np.bincount(source[arrived], minlength=n_sources)
+            lost = (kind == REJECTED) | (kind == EVICTED)
+            rejected += np.bincount(source[lost], minlength=n_sources)
+
+            started = kind == STARTED
+            s = chunk[started]
+            completed += np.bincount(s['source'], minlength=n_sources)
+            wait += np.bincount(s['source'], weights=s['time'] - s['submitted'], minlength=n_sources)
+            service += np.bincount(s['source'], weights=s['until'] - s['time'], minlength=n_sources)
+
+            # A dispatched batch is a run of STARTED rows sharing device and
+            # time; count each batch once for the device.
+            if len(s):
+                first = np.ones(len(s), dtype=bool)
+                first[1:] = (s['device'][1:] != s['device'][:-1]) | (s['time'][1:] != s['time'][:-1])
+                if previous is not None:
+                    first[0] = (s['device'][0], s['time'][0]) != previous
+                previous = (s['device'][-1], s['time'][-1])
+                batches = s[first]
+                busy_time += np.bincount(batches['device'], weights=batches['until'] - batches['time'],
+                                         minlength=n_devices)
+                processed += np.bincount(batches['device'], minlength=n_devices)
+
+        clock = self.end_time
+        total_generated = int(generated.sum())
+        total_rejected = int(rejected.sum())
+        total_completed = int(completed.sum())
+
+        def mean(total, count):
+            return float(total / count) if count else 0.0
+
+        return {
+            'generated': total_generated,
+            'completed': total_completed,
+            'rejected': total_rejected,
+            'rejection_percent': total_rejected / total_generated * 100 if total_generated else 0,
+            'avg_waiting_time': mean(wait.sum(), total_completed),
+            'avg_service_time': mean(service.sum(), total_completed),
+            'sources': [
+                {
+                    'source': name,
+                    'generated': int(generated[i]),
+                    'rejected': int(rejected[i]),
+                    'completed': int(completed[i]),
+                    'rejection_percent': rejected[i] / generated[i] * 100 if generated[i] else 0.0,
+                    'avg_waiting_time': mean(wait[i], completed[i]),
+                    'avg_service_time': mean(service[i], completed[i]),
+                }
+                for i, name in enumerate(self.metadata['sources'])
+            ],
+            'devices': [
+                {
+                    'device': name,
+                    'total_busy_time': float(busy_time[i]),
+                    'processed_count': int(processed[i]),
+                    'utilization_percent': min(busy_time[i] / clock * 100, 100) if clock > 0 else 0.0,
+                }
+                for i, name in enumerate(self.metadata['devices'])
+            ],
+        }
+
+    def _device_checkpoints(self):
+        """Busy-until of every device's last dispatch before each ``CHECKPOINT_EVENTS``-th event.
+
+        Row ``k`` covers ``events[:k * CHECKPOINT_EVENTS]``, NaN for devices
+        not dispatched yet. Built in one pass on first use.
+        """
+        if self._checkpoints is None:
+            until = np.full(len(self.metadata['devices']), np.nan)
+            rows = [until.copy()]
+            for chunk in self.chunks(chunk_size=CHECKPOINT_EVENTS):
+                _last_dispatch(chunk, until)
+                rows.append(until.copy())
+            self._checkpoints = np.array(rows)
+        return self._checkpoints
+
+    def state_at(self, time):
+        """Buffer contents and device states (ОД3) right after ``time``.
+
+        Scans backwards from ``time`` only until every report still buffered
+        has been found (the ``queue`` column gives their number). Device
+        states start from the nearest checkpoint before ``time`` and read at
+        most ``CHECKPOINT_EVENTS`` events forward from it.
+        """
+        end = self.index_at(time)
+
+        occupancy = int(self.events['queue'][end - 1]) if end else 0
+        removed = np.empty(0, dtype=np.int64)
+        buffered = []
+
+        stop = end
+        while stop > 0 and len(buffered) < occupancy:
+            start = max(stop - READ_CHUNK_SIZE, 0)
+            chunk = np.asarray(self.events[start:stop])[::-1]
+            kind = chunk['kind']
+            gone = (kind == EVICTED) | (kind == STARTED)
+            removed = np.union1d(removed, chunk['report'][gone])
+            accepted = chunk[kind == ACCEPTED]
+            alive = accepted[~np.isin(accepted['report'], removed)]
+            buffered.extend(alive[:occupancy - len(buffered)].tolist())
+            stop = start
+
+        checkpoint = end // CHECKPOINT_EVENTS
+        until = self._device_checkpoints()[checkpoint].copy()
+        _last_dispatch(np.asarray(self.events[checkpoint * CHECKPOINT_EVENTS:end]), until)
+        devices = [None if math.isnan(u) else u for u in until.tolist()]
+
+        names = TRACE_DTYPE.names
+        buffered = [dict(zip(names, row)) for row in reversed(buffered)]
+
+        return {
+            'time': time,
+            'buffer': [
+                {
+                    'report': int(r['report']),
+                    'source': self.metadata['sources'][r['source']],
+                    'priority': int(r['priority']),
+                    'submitted': float(r['submitted']),
+                }
+                for r in buffered
+            ],
+            'devices': [
+                {
+                    'device': name,
+                    'busy_until': until if until is not None and until > time else None,
+                }
+                for name, until in zip(self.metadata['devices'], devices)
+            ],
+        }
+
+    def timeline(self, times):
+        """``state_at`` for each of the sorted instants ``times``."""
+        return [self.state_at(t) for t in times]
+
+
+def format_state(state):
+    """Render a ``state_at`` result like the step-mode buffer/operators columns."""
+    buffer = state['buffer']
+    devices = "; ".join(
+        f"{d['device']}:" + ('free' if d['busy_until'] is None else f"busy→{d['busy_until']:.1f}")
+        for d in state['devices']
+    )
+    return f"{len(buffer)}: {[r['priority'] for r in buffer]}", devices
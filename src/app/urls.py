@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('jobs/', views.jobs, name='jobs'),
+    path('jobs/<str:job_id>/', views.job, name='job'),
+    path('jobs/<str:job_id>/events/', views.job_events, name='job-events'),
+]
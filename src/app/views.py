@@ -0,0 +1,109 @@
+"""HTTP API for simulation and sweep jobs (see ``jobs.py``).
+
+The views are async: under an ASGI server (uvicorn, daphne) waiting for
+progress never holds a thread. The ``JobManager`` is not tied to an event
+loop, so the views also work under WSGI, where each request runs in a loop
+of its own.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+
+from .jobs import get_manager, job_config
+
+# Seconds of silence after which an event stream sends a keep-alive comment.
+KEEPALIVE_INTERVAL = 15
+
+
+def _manager():
+    return get_manager(settings.SIMULATION_JOB_WORKERS, settings.SIMULATION_JOB_CACHE_DIR)
+
+
+def _get_job(job_id):
+    job = _manager().get(job_id)
+    if job is None:
+        raise Http404("No such job")
+    return job
+
+
+def _links(request, job):
+    return {
+        'url': request.build_absolute_uri(reverse('job', args=[job.id])),
+        'events': request.build_absolute_uri(reverse('job-events', args=[job.id])),
+    }
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+async def jobs(request):
+    """List the known jobs, or submit one.
+
+    A submission is ``{"kind": "simulation" | "sweep", "params": {...},
+    "seed": 0}``, sweeps adding ``"grid": ["lambda=0.5,1", ...]`` and
+    optionally ``"replications"``. A new job is answered with 202; an
+    identical one already known is returned with 200.
+    """
+    manager = _manager()
+
+    if request.method == "GET":
+        return JsonResponse({'jobs': [
+            {**job.as_dict(with_result=False), **_links(request, job)}
+            for job in manager.all()
+        ]})
+
+    try:
+        config = job_config(json.loads(request.body or b'{}'))
+    except (json.JSONDecodeError, ValueError) as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    job, created = await manager.submit(config)
+    return JsonResponse(
+        {'id': job.id, 'status': job.status, 'deduplicated': not created, **_links(request, job)},
+        status=202 if created else 200,
+    )
+
+
+@require_GET
+async def job(request, job_id):
+    job = _get_job(job_id)
+    return JsonResponse({**job.as_dict(), **_links(request, job)})
+
+
+@require_GET
+async def job_events(request, job_id):
+    """Server-sent events: ``status`` changes, ``progress`` snapshots and a final ``result``."""
+    job = _get_job(job_id)
+    manager = _manager()
+
+    async def stream():
+        queue = manager.subscribe(job)
+        try:
+            yield _event('status', {'status': job.status})
+            if job.progress is not None and not job.finished:
+                yield _event('progress', job.progress)
+
+            while not job.finished:
+                try:
+                    name, data = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _event(name, data)
+
+            yield _event('result', job.as_dict())
+        finally:
+            manager.unsubscribe(job, queue)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
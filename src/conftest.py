@@ -0,0 +1,11 @@
+"""pytest bootstrap: the app tests import Django models, so configure Django first.
+
+``python manage.py test app`` runs the same tests with Django's own runner.
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('DJANGO_SECRET_KEY', 'test')
+django.setup()
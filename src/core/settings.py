@@ -79,6 +79,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL lets readers work while a run is being saved; with WAL,
+            # synchronous=NORMAL only syncs at checkpoints instead of per commit.
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
     }
 }
 
@@ -120,3 +125,8 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Simulation job API (app.jobs): size of the worker process pool and the
+# result cache shared with the sweep command.
+SIMULATION_JOB_WORKERS = int(os.getenv("SIMULATION_JOB_WORKERS", os.cpu_count() or 1))
+SIMULATION_JOB_CACHE_DIR = BASE_DIR / '.sweep_cache'